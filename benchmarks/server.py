@@ -0,0 +1,218 @@
+"""
+Local stand-in for midas-server used by the benchmarks.
+
+Serves synthetic MBP-1 streams for any symbols and time window, accepts
+record and backtest uploads, and answers instrument lookups, so client
+throughput can be measured without a live server or database.
+
+Streams hold one record per symbol every `--step` nanoseconds of the
+requested window and are written in `--chunk-size` byte chunks. Uploads
+are read in full and acknowledged with JSON status messages, each sent
+as its own chunk like the real server does.
+
+Usage: python benchmarks/server.py [--port 8090] [--step 1000000000]
+       [--chunk-size 65536] [--instruments 1000]
+"""
+
+import json
+import zlib
+import argparse
+import threading
+import numpy as np
+from functools import lru_cache
+from urllib.parse import urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from mbn import Dataset, Metadata, Schema, SymbolMap
+from midas_client.arrays import MBP1_DTYPE, MBP1_RTYPE
+from midas_client.stream import END_OF_STREAM, RECORD_LENGTH_MULTIPLIER
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and bodies are written separately, without this small
+    # responses wait on delayed ACKs.
+    disable_nagle_algorithm = True
+
+    # Set by `serve`
+    step = 1_000_000_000
+    chunk_size = 65_536
+    instruments = 1000
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        body = self._read_body()
+        path = urlsplit(self.path).path
+
+        if path == "/historical/mbp/get/stream":
+            payload = json.loads(body)
+            stream = mbp_stream(
+                tuple(payload["symbols"]),
+                payload["start_ts"],
+                payload["end_ts"],
+                self.step,
+            )
+            self._send_chunks(stream, "application/octet-stream")
+        elif path == "/instruments/get":
+            ticker, _ = json.loads(body)
+            self._send_json({"code": 200, "data": [instrument(ticker)]})
+        elif path == "/instruments/get_many":
+            tickers, _ = json.loads(body)
+            data = [instrument(ticker) for ticker in tickers]
+            self._send_json({"code": 200, "data": data})
+        elif path == "/instruments/list_dataset":
+            data = [instrument(f"T{i}") for i in range(self.instruments)]
+            self._send_json({"code": 200, "data": data})
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        if urlsplit(self.path).path in (
+            "/historical/mbp/create/stream",
+            "/trading/backtest/create",
+        ):
+            received = len(self._read_body())
+            messages = [
+                {
+                    "status": "success",
+                    "message": "Processing batch",
+                    "code": 200,
+                    "data": "",
+                },
+                {
+                    "status": "success",
+                    "message": "Created",
+                    "code": 200,
+                    "data": str(received),
+                },
+            ]
+            self._send_messages(messages)
+        else:
+            self.send_error(404)
+
+    def _read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            data = bytearray()
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return bytes(data)
+                data += self.rfile.read(size)
+                self.rfile.readline()
+
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _send_chunks(self, body: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        view = memoryview(body)
+        for start in range(0, len(body), self.chunk_size):
+            chunk = view[start : start + self.chunk_size]
+            self.wfile.write(b"%x\r\n" % len(chunk))
+            self.wfile.write(chunk)
+            self.wfile.write(b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _send_messages(self, messages: list):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        for message in messages:
+            data = json.dumps(message).encode()
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _send_json(self, data: dict):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def instrument(ticker: str) -> dict:
+    return {
+        "instrument_id": zlib.crc32(ticker.encode()) % 100_000,
+        "ticker": ticker,
+        "name": ticker,
+        "dataset": "Equities",
+        "vendor": "Databento",
+        "is_continuous": False,
+    }
+
+
+@lru_cache(maxsize=8)
+def mbp_stream(symbols: tuple, start: int, end: int, step: int) -> bytes:
+    """
+    Encodes a metadata header, one MBP-1 record per symbol every `step`
+    nanoseconds from `start` to `end`, and the end-of-stream message.
+    """
+    ids = {symbol: i + 1 for i, symbol in enumerate(symbols)}
+    metadata = Metadata(
+        Schema.MBP1,
+        Dataset.EQUITIES,
+        start,
+        end,
+        SymbolMap({i: s for s, i in ids.items()}),
+    )
+
+    ts = np.arange(start, end, step, dtype=np.uint64)
+    records = np.zeros(len(ts) * len(ids), dtype=MBP1_DTYPE)
+    records["length"] = MBP1_DTYPE.itemsize // RECORD_LENGTH_MULTIPLIER
+    records["rtype"] = MBP1_RTYPE
+    records["instrument_id"] = np.tile(np.arange(1, len(ids) + 1), len(ts))
+    records["ts_event"] = np.repeat(ts, len(ids))
+    records["ts_recv"] = records["ts_event"]
+    records["price"] = 100_000_000_000 + np.arange(len(records)) % 1000
+    records["size"] = 1
+    records["action"] = b"T"
+    records["side"] = b"N"
+    records["bid_px"] = records["price"] - 1_000_000
+    records["ask_px"] = records["price"] + 1_000_000
+
+    return bytes(metadata.encode()) + records.tobytes() + END_OF_STREAM
+
+
+def serve(
+    port: int,
+    step: int = 1_000_000_000,
+    chunk_size: int = 65_536,
+    instruments: int = 1000,
+) -> ThreadingHTTPServer:
+    """Starts the server on a background thread and returns it."""
+    Handler.step = step
+    Handler.chunk_size = chunk_size
+    Handler.instruments = instruments
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--step", type=int, default=1_000_000_000)
+    parser.add_argument("--chunk-size", type=int, default=65_536)
+    parser.add_argument("--instruments", type=int, default=1000)
+    args = parser.parse_args()
+
+    server = serve(args.port, args.step, args.chunk_size, args.instruments)
+    print(f"Serving on http://127.0.0.1:{args.port}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
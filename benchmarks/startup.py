@@ -0,0 +1,68 @@
+"""
+Measures the cost of importing `midas_client` and constructing clients.
+
+Every run starts a fresh interpreter so module caches don't hide the import
+time. Reports the median over all runs, in milliseconds, for:
+- import: `import midas_client`
+- init: `DatabaseClient()`
+- instrument / historical: first access of that sub-client
+
+Usage: python benchmarks/startup.py [--runs 20]
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+SCRIPT = """
+import json, time
+t0 = time.perf_counter()
+import midas_client
+t1 = time.perf_counter()
+client = midas_client.DatabaseClient()
+t2 = time.perf_counter()
+client.{client}
+t3 = time.perf_counter()
+print(json.dumps([t1 - t0, t2 - t1, t3 - t2]))
+"""
+
+
+def run(client: str, runs: int) -> dict:
+    env = dict(os.environ)
+    for var in ("HISTORICAL_URL", "TRADING_URL", "INSTRUMENT_URL"):
+        env.setdefault(var, "http://127.0.0.1:8080")
+
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", SCRIPT.format(client=client)],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        samples.append(json.loads(output))
+
+    names = ("import", "init", client)
+    return {
+        name: statistics.median(s[i] for s in samples) * 1000
+        for i, name in enumerate(names)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    for client in ("instrument", "historical"):
+        results = run(client, args.runs)
+        timings = ", ".join(f"{k}={v:.1f}ms" for k, v in results.items())
+        print(f"{client:<12} {timings}")
+
+
+if __name__ == "__main__":
+    main()
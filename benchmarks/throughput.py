@@ -0,0 +1,411 @@
+"""
+Measures client throughput, latency and memory against the local stand-in
+server in `benchmarks/server.py`.
+
+The server runs in its own process and every case in a fresh interpreter,
+so peak RSS is that of the case alone. Each case makes one untimed warm-up
+call, then `--iterations` timed calls, and reports:
+- p50 / p95 / p99: latency of one call, in milliseconds
+- records/s and MB/s: throughput at the median latency, for record calls
+- rss: peak resident memory of the process, in MB
+
+Results are appended as one JSON line per run to `bench_output.txt` (or
+`--output`), tagged with the package version and git revision, to compare
+releases. With `--baseline FILE` the run is compared against the last run
+in that file; cases whose p50 or peak RSS grew by more than `--tolerance`
+are reported and the script exits with status 1.
+
+Usage: python benchmarks/throughput.py [--records 1000000]
+       [--chunk-size 65536] [--iterations 10] [--cases get_records,...]
+       [--output bench_output.txt] [--baseline FILE] [--tolerance 0.2]
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import itertools
+import argparse
+import statistics
+import subprocess
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Interval between the synthetic records of one symbol, in nanoseconds.
+STEP = 1_000_000_000
+
+SYMBOLS = ["AAPL", "ES", "NQ", "CL"]
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+# Records uploaded per call by the JSON `create_records` case, whose body
+# is a JSON array of every byte.
+JSON_RECORDS = 10_000
+
+
+# Cases, run in the child process
+def _window(records: int) -> tuple:
+    """Start and end of the window holding `records` records, in ns."""
+    start = int(START.timestamp()) * 1_000_000_000
+    return start, start + -(-records // len(SYMBOLS)) * STEP
+
+
+def _params(records: int):
+    import mbn
+
+    start, end = _window(records)
+    fmt = "%Y-%m-%d %H:%M:%S"
+    return mbn.RetrieveParams(
+        SYMBOLS,
+        START.strftime(fmt),
+        datetime.fromtimestamp(end // 1_000_000_000, timezone.utc).strftime(
+            fmt
+        ),
+        mbn.Schema.MBP1,
+        mbn.Dataset.EQUITIES,
+        mbn.Stype.RAW,
+    )
+
+
+def _upload_data(records: int) -> bytes:
+    from server import mbp_stream
+    from midas_client.stream import END_OF_STREAM
+
+    stream = mbp_stream(tuple(SYMBOLS), *_window(records), STEP)
+    return stream[: -len(END_OF_STREAM)]
+
+
+def get_records(client, records: int):
+    params = _params(records)
+
+    def call():
+        client.historical.get_records(params)
+
+    return call, records
+
+
+def get_records_array(client, records: int):
+    params = _params(records)
+
+    def call():
+        client.historical.get_records_array(params)
+
+    return call, records
+
+
+def stream_records(client, records: int):
+    params = _params(records)
+
+    def call():
+        for _ in client.historical.stream_records(params, batch_size=100_000):
+            pass
+
+    return call, records
+
+
+def create_records(client, records: int):
+    data = list(_upload_data(min(records, JSON_RECORDS)))
+
+    def call():
+        client.historical.create_records(data)
+
+    return call, min(records, JSON_RECORDS)
+
+
+def create_records_stream(client, records: int):
+    data = _upload_data(records)
+
+    def call():
+        client.historical.create_records_stream([data])
+
+    return call, records
+
+
+def create_backtest(client, records: int):
+    from tests.test_trading import create_backtest as load_backtest
+
+    backtest = load_backtest()
+
+    def call():
+        client.trading.create_backtest(backtest)
+
+    return call, None
+
+
+def create_backtest_binary(client, records: int):
+    from tests.test_trading import create_backtest as load_backtest
+
+    backtest = load_backtest()
+
+    def call():
+        client.trading.create_backtest(backtest, binary=True)
+
+    return call, None
+
+
+def get_instrument(client, records: int):
+    tickers = itertools.cycle([f"T{i}" for i in range(100)])
+
+    def call():
+        client.instrument.get_instrument(next(tickers), "Equities")
+
+    return call, None
+
+
+def get_instruments(client, records: int):
+    tickers = [f"T{i}" for i in range(100)]
+
+    def call():
+        client.instrument.get_instruments(tickers, "Equities")
+
+    return call, None
+
+
+def list_dataset_instruments(client, records: int):
+    def call():
+        client.instrument.list_dataset_instruments("Equities")
+
+    return call, None
+
+
+CASES = {
+    case.__name__: case
+    for case in (
+        get_records,
+        get_records_array,
+        stream_records,
+        create_records,
+        create_records_stream,
+        create_backtest,
+        create_backtest_binary,
+        get_instrument,
+        get_instruments,
+        list_dataset_instruments,
+    )
+}
+
+
+def run_case(name: str, records: int, iterations: int) -> dict:
+    from midas_client import DatabaseClient
+    from midas_client.arrays import MBP1_DTYPE
+
+    with DatabaseClient() as client:
+        call, count = CASES[name](client, records)
+        call()  # Warm-up, also fills the server's stream cache
+
+        latencies = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            call()
+            latencies.append(time.perf_counter() - started)
+
+    return {
+        "latencies": latencies,
+        "records": count,
+        "bytes": count * MBP1_DTYPE.itemsize if count else None,
+        "rss": _peak_rss(),
+    }
+
+
+def _peak_rss():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return rss / 1024 if sys.platform != "darwin" else rss / 1024**2
+
+
+# Runner
+def summarize(name: str, sample: dict) -> dict:
+    latencies = sorted(sample["latencies"])
+    median = statistics.median(latencies)
+    result = {
+        "case": name,
+        "p50": median * 1000,
+        "p95": _percentile(latencies, 0.95) * 1000,
+        "p99": _percentile(latencies, 0.99) * 1000,
+        "rss": sample["rss"],
+    }
+
+    if sample["records"]:
+        result["records_per_s"] = sample["records"] / median
+        result["mb_per_s"] = sample["bytes"] / median / 1024**2
+    return result
+
+
+def _percentile(values: list, q: float) -> float:
+    index = min(len(values) - 1, round(q * (len(values) - 1)))
+    return values[index]
+
+
+def start_server(chunk_size: int, env: dict) -> tuple:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            os.path.join(ROOT, "benchmarks", "server.py"),
+            f"--port={port}",
+            f"--step={STEP}",
+            f"--chunk-size={chunk_size}",
+        ],
+        env=env,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    server.stdout.readline()  # Wait until it is listening
+    return server, f"http://127.0.0.1:{port}"
+
+
+def compare(results: list, baseline: dict, tolerance: float) -> list:
+    """Returns the cases of `results` that regressed against `baseline`."""
+    previous = {r["case"]: r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get(result["case"])
+        if before is None:
+            continue
+        for key in ("p50", "rss"):
+            if before.get(key) and result.get(key):
+                if result[key] > before[key] * (1 + tolerance):
+                    regressions.append(
+                        f"{result['case']}: {key} {before[key]:.1f} -> "
+                        f"{result[key]:.1f}"
+                    )
+    return regressions
+
+
+def _version() -> dict:
+    try:
+        from importlib.metadata import version
+
+        package = version("midas_client")
+    except Exception:
+        package = None
+
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except OSError:
+        revision = ""
+
+    return {"version": package, "revision": revision or None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=65_536)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--cases", default=",".join(CASES))
+    parser.add_argument(
+        "--output", default=os.path.join(ROOT, "bench_output.txt")
+    )
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sample = run_case(args.child, args.records, args.iterations)
+        print(json.dumps(sample))
+        return
+
+    cases = args.cases.split(",")
+    for name in cases:
+        if name not in CASES:
+            parser.error(f"unknown case {name!r}")
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(
+            None,
+            [ROOT, os.path.join(ROOT, "benchmarks"), env.get("PYTHONPATH")],
+        )
+    )
+
+    server, url = start_server(args.chunk_size, env)
+    for var in ("HISTORICAL_URL", "TRADING_URL", "INSTRUMENT_URL"):
+        env[var] = url
+
+    results = []
+    try:
+        for name in cases:
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    f"--child={name}",
+                    f"--records={args.records}",
+                    f"--iterations={args.iterations}",
+                ],
+                cwd=ROOT,
+                env=env,
+                check=True,
+                stdout=subprocess.PIPE,
+                text=True,
+            ).stdout
+            sample = json.loads(output.splitlines()[-1])
+            result = summarize(name, sample)
+            results.append(result)
+
+            line = (
+                f"{name:<26} p50={result['p50']:.1f}ms "
+                f"p95={result['p95']:.1f}ms p99={result['p99']:.1f}ms"
+            )
+            if "records_per_s" in result:
+                line += (
+                    f" {result['records_per_s']:,.0f} records/s"
+                    f" {result['mb_per_s']:.1f} MB/s"
+                )
+            if result["rss"] is not None:
+                line += f" rss={result['rss']:.0f}MB"
+            print(line)
+    finally:
+        server.terminate()
+        server.wait()
+
+    run = {
+        "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        **_version(),
+        "records": args.records,
+        "chunk_size": args.chunk_size,
+        "iterations": args.iterations,
+        "results": results,
+    }
+    with open(args.output, "a") as f:
+        f.write(json.dumps(run) + "\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.loads(f.read().splitlines()[-1])
+
+        settings = ("records", "chunk_size")
+        if any(baseline.get(k) != run[k] for k in settings):
+            sys.exit(
+                "Baseline was run with different --records or --chunk-size, "
+                "not compared."
+            )
+
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"Regression {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+try:
+    import aiohttp  # noqa: F401
+except ImportError as e:
+    raise ImportError(
+        "The async client requires aiohttp, install it with "
+        "`pip install midas_client[async]`."
+    ) from e
+
+from .client import AsyncDatabaseClient
+from .historical import AsyncHistoricalClient
+from .trading import AsyncTradingClient
+from .instrument import AsyncInstrumentClient
+from .session import AsyncHttpSession
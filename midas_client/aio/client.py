@@ -0,0 +1,29 @@
+from dotenv import load_dotenv
+from .historical import AsyncHistoricalClient
+from .trading import AsyncTradingClient
+from .instrument import AsyncInstrumentClient
+from .session import AsyncHttpSession
+
+
+class AsyncDatabaseClient:
+    def __init__(self, pool_size: int = 100, keep_alive: bool = True):
+        load_dotenv()
+
+        # One pooled session shared by every sub-client
+        self.session = AsyncHttpSession(
+            pool_size=pool_size, keep_alive=keep_alive
+        )
+
+        self.historical = AsyncHistoricalClient(session=self.session)
+        self.trading = AsyncTradingClient(session=self.session)
+        self.instrument = AsyncInstrumentClient(session=self.session)
+
+    async def close(self) -> None:
+        """Closes every pooled connection."""
+        await self.session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
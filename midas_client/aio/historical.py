@@ -0,0 +1,148 @@
+import json
+from typing import AsyncIterator, Dict, List, Optional
+from mbn import BufferStore, RecordMsg, RetrieveParams
+from ..status import StatusParser
+from ..stream import RecordFramer
+from ..utils import load_url
+from .session import AsyncHttpSession
+
+
+class AsyncHistoricalClient:
+    def __init__(
+        self,
+        api_url: str = "",
+        session: Optional[AsyncHttpSession] = None,
+    ):
+        if not api_url:
+            api_url = load_url("HISTORICAL_URL")
+
+        self.api_url = f"{api_url}/historical"
+        self.session = session if session is not None else AsyncHttpSession()
+
+    async def create_records(self, data: List[int]) -> Optional[Dict]:
+        """
+        Stream loading main used for testing.
+        """
+        last_response = None
+
+        async for chunk_data in self.stream_create_records(data):
+            last_response = chunk_data
+
+        # Return the last response
+        return last_response
+
+    async def stream_create_records(
+        self, data: List[int]
+    ) -> AsyncIterator[Dict]:
+        """
+        Loads records, yielding each status message the server streams back
+        while they are being inserted.
+        """
+        url = f"{self.api_url}/mbp/create/stream"
+
+        async with self.session.post(url, json=data) as response:
+            if response.status != 200:
+                raise ValueError(
+                    f"Error while creating records : {await response.text()}"
+                )
+
+            # Messages may span chunks, so they are reassembled as read
+            parser = StatusParser()
+            async for chunk in response.content.iter_any():
+                for message in parser.feed(chunk):
+                    yield message
+            parser.close()
+
+    async def get_records(self, params: RetrieveParams) -> BufferStore:
+        url = f"{self.api_url}/mbp/get/stream"
+
+        payload_dict = json.loads(params.to_json())
+
+        async with self.session.get(url, json=payload_dict) as response:
+            if response.status != 200:
+                raise ValueError(
+                    f"Instrument list retrieval failed: {await response.text()}"
+                )
+
+            framer = RecordFramer()
+            bin_data = bytearray()
+
+            # Read the streamed content in chunks
+            async for chunk in response.content.iter_any():
+                framer.feed(chunk)
+                data, _ = framer.take()
+                bin_data.extend(data)
+
+                if framer.finished:
+                    break
+
+        if framer.metadata is None:
+            raise ValueError("Record stream ended before the metadata header.")
+
+        if not framer.finished:
+            raise ValueError(
+                "Record stream ended before the end-of-stream message."
+            )
+
+        return BufferStore(framer.metadata + bin_data)
+
+    async def stream_records(
+        self,
+        params: RetrieveParams,
+        batch_size: int = 10_000,
+    ) -> AsyncIterator[List[RecordMsg]]:
+        """
+        Streams records matching `params`, decoding them as chunks arrive.
+
+        Async counterpart of `HistoricalClient.stream_records`.
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be a positive integer.")
+
+        url = f"{self.api_url}/mbp/get/stream"
+
+        payload_dict = json.loads(params.to_json())
+
+        framer = RecordFramer()
+        batch = bytearray()
+        batch_count = 0
+
+        async with self.session.get(url, json=payload_dict) as response:
+            if response.status != 200:
+                raise ValueError(
+                    f"Instrument list retrieval failed: {await response.text()}"
+                )
+
+            async for chunk in response.content.iter_any():
+                framer.feed(chunk)
+
+                while True:
+                    data, count = framer.take(batch_size - batch_count)
+                    if count == 0:
+                        break
+
+                    batch.extend(data)
+                    batch_count += count
+
+                    if batch_count == batch_size:
+                        yield self._decode(framer.metadata, batch)
+                        batch = bytearray()
+                        batch_count = 0
+
+                if framer.finished:
+                    break
+
+        if framer.metadata is None:
+            raise ValueError("Record stream ended before the metadata header.")
+
+        if not framer.finished:
+            raise ValueError(
+                "Record stream ended before the end-of-stream message."
+            )
+
+        if batch_count:
+            yield self._decode(framer.metadata, batch)
+
+    @staticmethod
+    def _decode(metadata: bytes, records: bytearray) -> List[RecordMsg]:
+        return BufferStore(metadata + records).decode_to_array()
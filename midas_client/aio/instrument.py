@@ -0,0 +1,53 @@
+from typing import Dict, Optional
+from mbn import Dataset, Vendors
+from ..utils import load_url
+from .session import AsyncHttpSession
+
+
+class AsyncInstrumentClient:
+    def __init__(
+        self,
+        api_url: str = "",
+        session: Optional[AsyncHttpSession] = None,
+    ):
+        if not api_url:
+            api_url = load_url("INSTRUMENT_URL")
+
+        self.api_url = f"{api_url}/instruments"
+        self.session = session if session is not None else AsyncHttpSession()
+
+    async def get_instrument(self, ticker: str, dataset: Dataset) -> Dict:
+        url = f"{self.api_url}/get"
+        payload = (ticker, dataset)
+
+        async with self.session.get(url, json=payload) as response:
+            if response.status != 200:
+                raise ValueError(
+                    f"Instrument list retrieval failed: {await response.text()}"
+                )
+            return await response.json()
+
+    async def list_dataset_instruments(self, dataset: Dataset) -> Dict:
+        url = f"{self.api_url}/list_dataset"
+
+        async with self.session.get(url, json=dataset) as response:
+            if response.status != 200:
+                raise ValueError(
+                    f"Instrument list retrieval failed: {await response.text()}"
+                )
+            return await response.json()
+
+    async def list_vendor_instruments(
+        self,
+        vendor: Vendors,
+        dataset: Dataset,
+    ) -> Dict:
+        url = f"{self.api_url}/list_vendor"
+        payload = (vendor, dataset)
+
+        async with self.session.get(url, json=payload) as response:
+            if response.status != 200:
+                raise ValueError(
+                    f"Instrument list retrieval failed: {await response.text()}"
+                )
+            return await response.json()
@@ -0,0 +1,47 @@
+import aiohttp
+from typing import Optional
+
+
+class AsyncHttpSession:
+    """
+    Connection-pooled aiohttp session shared by the async sub-clients.
+
+    The underlying `aiohttp.ClientSession` is created on first use so the
+    client can be constructed outside of a running event loop.
+
+    Parameters:
+    - pool_size (int): Maximum number of simultaneous connections.
+    - keep_alive (bool): Reuse connections between requests.
+    """
+
+    def __init__(self, pool_size: int = 100, keep_alive: bool = True):
+        if pool_size <= 0:
+            raise ValueError("pool_size must be a positive integer.")
+
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                force_close=not self.keep_alive,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    def get(self, url: str, **kwargs):
+        return self.session.get(url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.session.post(url, **kwargs)
+
+    def delete(self, url: str, **kwargs):
+        return self.session.delete(url, **kwargs)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
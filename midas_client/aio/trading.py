@@ -0,0 +1,113 @@
+from typing import AsyncIterator, Dict, Optional
+from mbn import BacktestData, LiveData, PyBacktestEncoder
+from ..status import StatusParser
+from ..utils import load_url
+from .session import AsyncHttpSession
+
+
+class AsyncTradingClient:
+    def __init__(
+        self,
+        api_url: str = "",
+        session: Optional[AsyncHttpSession] = None,
+    ):
+        if not api_url:
+            api_url = load_url("TRADING_URL")
+
+        self.api_url = f"{api_url}/trading"
+        self.session = session if session is not None else AsyncHttpSession()
+
+    async def create_live(self, data: LiveData) -> Dict:
+        url = f"{self.api_url}/live/create"
+
+        async with self.session.post(url, json=data.__dict__()) as response:
+            if response.status != 200:
+                raise ValueError(
+                    f"Create live failed: {await response.text()}"
+                )
+            return await response.json()
+
+    async def delete_live(self, id: int) -> Dict:
+        url = f"{self.api_url}/live/delete"
+
+        async with self.session.delete(url, json=id) as response:
+            if response.status != 200:
+                raise ValueError(
+                    f"Deleting live failed: {await response.text()}"
+                )
+            return await response.json()
+
+    async def get_live(self, id: int) -> Dict:
+        url = f"{self.api_url}/live/get?id={id}"
+
+        async with self.session.get(url) as response:
+            if response.status != 200:
+                raise ValueError(
+                    f"Live instance retrieval failed: {await response.text()}"
+                )
+            return await response.json()
+
+    async def create_backtest(self, data: BacktestData) -> Optional[Dict]:
+        last_response = None
+
+        async for chunk_data in self.stream_create_backtest(data):
+            last_response = chunk_data
+
+        # Return the last response
+        return last_response
+
+    async def stream_create_backtest(
+        self,
+        data: BacktestData,
+    ) -> AsyncIterator[Dict]:
+        """
+        Creates a backtest, yielding each status message the server streams
+        back while it is being stored.
+        """
+        url = f"{self.api_url}/backtest/create"
+
+        encoder = PyBacktestEncoder()
+        buffer = encoder.encode_backtest(data)
+
+        async with self.session.post(url, json=buffer) as response:
+            if response.status != 200:
+                raise ValueError(
+                    f"Error while creating records : {await response.text()}"
+                )
+
+            # Messages may span chunks, so they are reassembled as read
+            parser = StatusParser()
+            async for chunk in response.content.iter_any():
+                for message in parser.feed(chunk):
+                    yield message
+            parser.close()
+
+    async def delete_backtest(self, id: int) -> Dict:
+        url = f"{self.api_url}/backtest/delete"
+
+        async with self.session.delete(url, json=id) as response:
+            if response.status != 200:
+                raise ValueError(
+                    f"Instrument list retrieval failed: {await response.text()}"
+                )
+            return await response.json()
+
+    async def get_backtest(self, id: int) -> Dict:
+        url = f"{self.api_url}/backtest/get?id={id}"
+
+        async with self.session.get(url) as response:
+            if response.status != 200:
+                raise ValueError(
+                    f"Instrument list retrieval failed: {await response.text()}"
+                )
+            return await response.json()
+
+    async def get_backtest_by_name(self, name: str) -> Dict:
+        url = f"{self.api_url}/backtest/get?name={name}"
+
+        async with self.session.get(url) as response:
+            if response.status != 200:
+                raise ValueError(
+                    f"Instrument list retrieval failed: {await response.text()}"
+                )
+            return await response.json()
@@ -0,0 +1,216 @@
+import os
+import struct
+import numpy as np
+from typing import Dict, List, Tuple, Union
+from mbn import Metadata, Schema
+from .stream import METADATA_PREFIX_SIZE, RECORD_LENGTH_MULTIPLIER
+
+# Prices are fixed-point integers in units of 1e-9.
+PRICE_SCALE = 1_000_000_000
+
+# Fields holding fixed-point prices and nanosecond UNIX timestamps.
+PRICE_FIELDS = ("price", "open", "high", "low", "close", "bid_px", "ask_px")
+TIMESTAMP_FIELDS = ("ts_event", "ts_recv")
+
+# (name, format, offset) of the fields of each record, padding skipped.
+_HEADER = [
+    ("length", "u1", 0),
+    ("rtype", "u1", 1),
+    ("instrument_id", "<u4", 4),
+    ("ts_event", "<u8", 8),
+    ("rollover_flag", "u1", 16),
+]
+
+
+def _level(offset: int) -> List[Tuple[str, str, int]]:
+    return [
+        ("bid_px", "<i8", offset),
+        ("ask_px", "<i8", offset + 8),
+        ("bid_sz", "<u4", offset + 16),
+        ("ask_sz", "<u4", offset + 20),
+        ("bid_ct", "<u4", offset + 24),
+        ("ask_ct", "<u4", offset + 28),
+    ]
+
+
+def _record_dtype(size: int, fields: List[Tuple[str, str, int]]) -> np.dtype:
+    fields = _HEADER + fields
+    return np.dtype(
+        {
+            "names": [f[0] for f in fields],
+            "formats": [f[1] for f in fields],
+            "offsets": [f[2] for f in fields],
+            "itemsize": size,
+        }
+    )
+
+
+MBP1_DTYPE = _record_dtype(
+    96,
+    [
+        ("price", "<i8", 24),
+        ("size", "<u4", 32),
+        ("action", "S1", 36),
+        ("side", "S1", 37),
+        ("depth", "u1", 38),
+        ("flags", "u1", 39),
+        ("ts_recv", "<u8", 40),
+        ("ts_in_delta", "<i4", 48),
+        ("sequence", "<u4", 52),
+        ("discriminator", "<u4", 56),
+    ]
+    + _level(64),
+)
+
+# Record type written in the header of MBP-1 records.
+MBP1_RTYPE = 1
+
+_LEVEL_FIELDS = [f[0] for f in _level(0)]
+
+# TBBO records share the MBP-1 layout.
+TBBO_DTYPE = MBP1_DTYPE
+
+TRADE_DTYPE = _record_dtype(
+    56,
+    [
+        ("price", "<i8", 24),
+        ("size", "<u4", 32),
+        ("action", "S1", 36),
+        ("side", "S1", 37),
+        ("depth", "u1", 38),
+        ("flags", "u1", 39),
+        ("ts_recv", "<u8", 40),
+        ("ts_in_delta", "<i4", 48),
+        ("sequence", "<u4", 52),
+    ],
+)
+
+OHLCV_DTYPE = _record_dtype(
+    64,
+    [
+        ("open", "<i8", 24),
+        ("high", "<i8", 32),
+        ("low", "<i8", 40),
+        ("close", "<i8", 48),
+        ("volume", "<u8", 56),
+    ],
+)
+
+BBO_DTYPE = _record_dtype(
+    88,
+    [
+        ("price", "<i8", 24),
+        ("size", "<u4", 32),
+        ("side", "S1", 36),
+        ("flags", "u1", 37),
+        ("ts_recv", "<u8", 40),
+        ("sequence", "<u4", 48),
+    ]
+    + _level(56),
+)
+
+SCHEMA_DTYPES = {
+    "mbp-1": MBP1_DTYPE,
+    "tbbo": TBBO_DTYPE,
+    "trades": TRADE_DTYPE,
+    "ohlcv-1s": OHLCV_DTYPE,
+    "ohlcv-1m": OHLCV_DTYPE,
+    "ohlcv-1h": OHLCV_DTYPE,
+    "ohlcv-1d": OHLCV_DTYPE,
+    "bbo-1s": BBO_DTYPE,
+    "bbo-1m": BBO_DTYPE,
+}
+
+
+def mbp1_from_dicts(records: List[Dict]) -> np.ndarray:
+    """
+    Builds an MBP-1 record array from vendor records in the JSON format of
+    `Mbp1Msg` (top-of-book in `levels[0]`), one column at a time.
+    """
+    array = np.zeros(len(records), dtype=MBP1_DTYPE)
+    array["length"] = MBP1_DTYPE.itemsize // RECORD_LENGTH_MULTIPLIER
+    array["rtype"] = MBP1_RTYPE
+
+    for name in MBP1_DTYPE.names:
+        if name in ("length", "rtype") or name in _LEVEL_FIELDS:
+            continue
+        array[name] = [r[name] for r in records]
+
+    levels = [r["levels"][0] if r.get("levels") else {} for r in records]
+    for name in _LEVEL_FIELDS:
+        array[name] = [level.get(name, 0) for level in levels]
+
+    return array
+
+
+def schema_dtype(schema: Union[Schema, str]) -> np.dtype:
+    """Returns the structured dtype of the records of `schema`."""
+    try:
+        return SCHEMA_DTYPES[str(schema)]
+    except KeyError:
+        raise ValueError(f"No record layout for schema {schema}.") from None
+
+
+def records_to_array(metadata: bytes, records: bytes) -> np.ndarray:
+    """
+    Views encoded `records` as a structured array of the schema in their
+    encoded `metadata`, without copying them. The array is read-only.
+    """
+    dtype = schema_dtype(Metadata.decode(metadata).schema)
+    return np.frombuffer(records, dtype=dtype)
+
+
+def to_array(data: bytes) -> np.ndarray:
+    """Views the records of an MBN buffer as a read-only structured array."""
+    (length,) = struct.unpack_from("<H", data)
+    end = METADATA_PREFIX_SIZE + length
+    dtype = schema_dtype(Metadata.decode(data[:end]).schema)
+    return np.frombuffer(data, dtype=dtype, offset=end)
+
+
+def read_array(path: str) -> np.ndarray:
+    """
+    Memory-maps the records of an MBN file as a read-only structured array,
+    so files larger than memory can be sliced and filtered.
+    """
+    metadata = read_metadata(path)
+    dtype = schema_dtype(Metadata.decode(metadata).schema)
+
+    # Empty regions can't be mapped
+    if os.path.getsize(path) == len(metadata):
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=len(metadata))
+
+
+def read_metadata(path: str) -> bytes:
+    """Reads the encoded metadata at the start of an MBN file."""
+    with open(path, "rb") as f:
+        prefix = f.read(METADATA_PREFIX_SIZE)
+        (length,) = struct.unpack("<H", prefix)
+        return prefix + f.read(length)
+
+
+def pretty_array(array: np.ndarray) -> np.ndarray:
+    """
+    Returns a copy of a record array with prices converted to float64 and
+    timestamps to `datetime64[ns]`, one vectorised operation per field.
+    """
+    names = array.dtype.names
+    formats = []
+    for name in names:
+        if name in PRICE_FIELDS:
+            formats.append("<f8")
+        elif name in TIMESTAMP_FIELDS:
+            formats.append("<M8[ns]")
+        else:
+            formats.append(array.dtype.fields[name][0])
+
+    out = np.empty(len(array), dtype={"names": names, "formats": formats})
+    for name in names:
+        if name in PRICE_FIELDS:
+            np.divide(array[name], PRICE_SCALE, out=out[name])
+        elif name in TIMESTAMP_FIELDS:
+            out[name] = array[name].view("<M8[ns]")
+        else:
+            out[name] = array[name]
+    return out
@@ -0,0 +1,183 @@
+import os
+import numpy as np
+from typing import Dict, Iterable, List, Tuple
+from mbn import Metadata
+from .arrays import TIMESTAMP_FIELDS, pretty_array, records_to_array
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Arrow export is optional
+    pa = None
+    pq = None
+
+# Nanoseconds per day, used to partition records by UTC date.
+NANOS_PER_DAY = 86_400_000_000_000
+
+# Header fields that describe the encoding rather than the record.
+_SKIPPED_FIELDS = ("length", "rtype")
+
+
+def to_record_batch(metadata: bytes, records: bytes) -> "pa.RecordBatch":
+    """
+    Converts encoded records into an Arrow record batch, with float prices,
+    UTC timestamps and a `symbol` column resolved from the metadata.
+    """
+    _pyarrow()
+    decoded = Metadata.decode(metadata)
+    array = pretty_array(records_to_array(metadata, records))
+
+    columns = [_symbol_column(array["instrument_id"], decoded)]
+    names = ["symbol"]
+    for name in array.dtype.names:
+        if name in _SKIPPED_FIELDS:
+            continue
+
+        column = np.ascontiguousarray(array[name])
+        if name in TIMESTAMP_FIELDS:
+            columns.append(pa.array(column, pa.timestamp("ns", tz="UTC")))
+        elif column.dtype.kind == "S":
+            columns.append(pa.array(column.astype("U")))
+        else:
+            columns.append(pa.array(column))
+        names.append(name)
+
+    return pa.RecordBatch.from_arrays(columns, names=names)
+
+
+class PartitionedParquetWriter:
+    """
+    Writes Arrow record batches into a Hive-style partitioned Parquet
+    dataset, `root/schema=<schema>/symbol=<symbol>/date=<YYYY-MM-DD>/`.
+
+    Each partition is written incrementally through its own `ParquetWriter`.
+    Records arrive in time order, so partitions of dates before the earliest
+    date of a new batch are complete and their files are closed right away.
+    Should a closed partition receive records again, they go to a new
+    `part-<n>.parquet` file next to the first.
+
+    Parameters:
+    - root (str): Directory of the dataset.
+    - schema (str): Schema name of the records, e.g. `mbp-1`.
+    """
+
+    def __init__(self, root: str, schema: str):
+        _pyarrow()
+        self.root = root
+        self.schema = schema
+        self.paths: List[str] = []
+        self._writers: Dict[Tuple[str, int], "pq.ParquetWriter"] = {}
+        self._parts: Dict[Tuple[str, int], int] = {}
+
+    def write(self, batch: "pa.RecordBatch") -> None:
+        """Writes a batch from `to_record_batch` into its partitions."""
+        if batch.num_rows == 0:
+            return
+
+        ts_event = batch.column("ts_event").cast(pa.int64()).to_numpy()
+        days = ts_event // NANOS_PER_DAY
+        symbols = batch.column("symbol")
+        codes = symbols.indices.to_numpy()
+
+        self._close_before(int(days.min()))
+
+        # Group rows by (symbol, day), keeping their order within a group.
+        keys = codes.astype(np.int64) * (int(days.max()) + 1) + days
+        order = np.argsort(keys, kind="stable")
+        bounds = np.flatnonzero(np.diff(keys[order])) + 1
+
+        # The symbol is stored in the partition path, not in the files.
+        columns = batch.schema.names[1:]
+        records = pa.RecordBatch.from_arrays(batch.columns[1:], columns)
+
+        for rows in np.split(order, bounds):
+            first = int(rows[0])
+            symbol = symbols.dictionary[codes[first]].as_py()
+            part = records.take(pa.array(rows))
+            self._writer(symbol, int(days[first]), part.schema).write_batch(
+                part
+            )
+
+    def close(self) -> None:
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _writer(
+        self, symbol: str, day: int, schema: "pa.Schema"
+    ) -> "pq.ParquetWriter":
+        key = (symbol, day)
+        writer = self._writers.get(key)
+        if writer is None:
+            date = np.datetime64(day, "D")
+            directory = os.path.join(
+                self.root,
+                f"schema={self.schema}",
+                f"symbol={symbol}",
+                f"date={date}",
+            )
+            os.makedirs(directory, exist_ok=True)
+            part = self._parts.get(key, 0)
+            self._parts[key] = part + 1
+            path = os.path.join(directory, f"part-{part}.parquet")
+            writer = pq.ParquetWriter(path, schema)
+            self._writers[key] = writer
+            self.paths.append(path)
+        return writer
+
+    def _close_before(self, day: int) -> None:
+        for key in [k for k in self._writers if k[1] < day]:
+            self._writers.pop(key).close()
+
+
+def write_parquet(
+    batches: Iterable[Tuple[bytes, bytes]], root: str
+) -> List[str]:
+    """
+    Writes `(metadata, records)` batches into a partitioned Parquet dataset
+    under `root`, returning the paths of the files written. Should a batch
+    fail, the files written so far are removed.
+    """
+    writer = None
+    try:
+        for metadata, records in batches:
+            if writer is None:
+                schema = str(Metadata.decode(metadata).schema)
+                writer = PartitionedParquetWriter(root, schema)
+            writer.write(to_record_batch(metadata, records))
+    except BaseException:
+        if writer is not None:
+            writer.close()
+            for path in writer.paths:
+                if os.path.exists(path):
+                    os.remove(path)
+        raise
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return writer.paths if writer is not None else []
+
+
+def _symbol_column(ids: np.ndarray, metadata: Metadata) -> "pa.Array":
+    mappings = metadata.mappings.map
+    unique, codes = np.unique(ids, return_inverse=True)
+    symbols = [mappings.get(int(i), str(i)) for i in unique]
+    return pa.DictionaryArray.from_arrays(
+        pa.array(codes.astype(np.int32)), pa.array(symbols, pa.string())
+    )
+
+
+def _pyarrow():
+    if pa is None:
+        raise ImportError(
+            "Arrow export requires the pyarrow package, install it with "
+            "`pip install midas_client[parquet]`."
+        )
+    return pa
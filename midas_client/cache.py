@@ -0,0 +1,414 @@
+import os
+import json
+import time
+import atexit
+import hashlib
+import weakref
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows locks files through msvcrt
+    fcntl = None
+    import msvcrt
+
+# Request fields that identify the records returned for a query.
+KEY_FIELDS = ("symbols", "schema", "dataset", "stype", "start_ts", "end_ts")
+
+
+class RecordCache:
+    """
+    Persistent on-disk cache of MBN files returned by `get_records`.
+
+    Entries are keyed by the symbols, schema, dataset, stype and time range
+    of the request. When the total size exceeds `max_bytes` the least
+    recently used entries are evicted.
+
+    Several processes may share a directory: every write of the index
+    merges this process's changes into the one on disk under a file lock.
+    Access times of cache hits are written at most once every
+    `save_interval` seconds, and on `flush` and interpreter exit.
+
+    Parameters:
+    - directory (str): Directory the MBN files and index are stored in.
+    - max_bytes (int): Maximum total size of the cached files.
+    - save_interval (float): Minimum seconds between writes of the access
+      times.
+    """
+
+    INDEX_FILE = "index.json"
+    LOCK_FILE = "index.lock"
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 10 * 1024**3,
+        save_interval: float = 5.0,
+    ):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be a positive integer.")
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._index = self._load_index()
+        # Changes not yet merged into the index file: entries written or
+        # removed (None), and access times of hits.
+        self._written: Dict[str, Optional[Dict]] = {}
+        self._accessed: Dict[str, float] = {}
+        self._saved_at = time.monotonic()
+
+        atexit.register(_flush_at_exit, weakref.ref(self))
+
+    @staticmethod
+    def key(payload_dict: Dict) -> str:
+        fields = {f: payload_dict[f] for f in KEY_FIELDS}
+        fields["symbols"] = sorted(fields["symbols"])
+        encoded = json.dumps(fields, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, payload_dict: Dict) -> Optional[str]:
+        """Returns the path of the cached MBN file, if there is one."""
+        key = self.key(payload_dict)
+
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+
+            path = self._path(key)
+            if not os.path.exists(path):
+                del self._index[key]
+                self._written[key] = None
+                self._changed()
+                return None
+
+            self._touch(key)
+            self._changed()
+            return path
+
+    def put(self, payload_dict: Dict, data: bytes) -> None:
+        """Stores the MBN encoded `data` returned for `payload_dict`."""
+        key = self.key(payload_dict)
+        path = self._path(key)
+
+        tmp_path = _tmp_path(path)
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            entry = {
+                "params": {f: payload_dict[f] for f in KEY_FIELDS},
+                "size": len(data),
+                "accessed": time.time(),
+            }
+            self._index[key] = self._written[key] = entry
+            self._sync()
+
+    def segments(self, payload_dict: Dict) -> List[Tuple[int, int, str]]:
+        """
+        Returns the cached entries for the same symbols, schema, dataset and
+        stype whose time range overlaps the requested one, as
+        `(start_ts, end_ts, path)` sorted by start.
+        """
+        wanted = {f: payload_dict[f] for f in KEY_FIELDS}
+        wanted_symbols = sorted(wanted["symbols"])
+        start, end = wanted["start_ts"], wanted["end_ts"]
+
+        found = []
+        with self._lock:
+            for key, entry in self._index.items():
+                params = entry["params"]
+                if sorted(params["symbols"]) != wanted_symbols or any(
+                    params[f] != wanted[f]
+                    for f in ("schema", "dataset", "stype")
+                ):
+                    continue
+                if params["end_ts"] <= start or params["start_ts"] >= end:
+                    continue
+                if not os.path.exists(self._path(key)):
+                    continue
+
+                self._touch(key)
+                found.append(
+                    (params["start_ts"], params["end_ts"], self._path(key))
+                )
+
+            if found:
+                self._changed()
+
+        return sorted(found)
+
+    def discard(self, payload_dict: Dict) -> None:
+        """Removes the entry stored for `payload_dict`, if there is one."""
+        key = self.key(payload_dict)
+        with self._lock:
+            self._remove(key)
+            self._written[key] = None
+            self._sync()
+
+    def clear(self) -> None:
+        """Removes every entry, including those of other processes."""
+        with self._lock, self._index_lock():
+            for key in set(self._load_index()) | set(self._index):
+                self._remove(key)
+            self._written.clear()
+            self._accessed.clear()
+            self._save_index()
+
+    def flush(self) -> None:
+        """Writes pending access times to the index file."""
+        with self._lock:
+            if self._written or self._accessed:
+                self._sync()
+
+    @property
+    def size(self) -> int:
+        """Total size in bytes of the cached files."""
+        return sum(entry["size"] for entry in self._index.values())
+
+    def _evict(self) -> None:
+        total = self.size
+        by_age = sorted(self._index, key=lambda k: self._index[k]["accessed"])
+
+        for key in by_age:
+            if total <= self.max_bytes:
+                break
+            total -= self._index[key]["size"]
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        self._index.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.bin")
+
+    def _touch(self, key: str) -> None:
+        now = time.time()
+        self._index[key]["accessed"] = now
+        self._accessed[key] = now
+
+    def _changed(self) -> None:
+        # Batched, so every cache hit doesn't rewrite the index.
+        if time.monotonic() - self._saved_at >= self.save_interval:
+            self._sync()
+
+    def _sync(self) -> None:
+        """
+        Merges the pending changes into the index file, reloading the
+        entries of other processes, and evicts across all of them.
+        """
+        with self._index_lock():
+            index = self._load_index()
+            for key, entry in self._written.items():
+                if entry is None:
+                    index.pop(key, None)
+                else:
+                    index[key] = entry
+            for key, accessed in self._accessed.items():
+                # Entries evicted by another process stay evicted.
+                if key in index:
+                    entry = index[key]
+                    entry["accessed"] = max(entry["accessed"], accessed)
+
+            self._index = index
+            self._written.clear()
+            self._accessed.clear()
+            self._evict()
+            self._save_index()
+
+        self._saved_at = time.monotonic()
+
+    @contextmanager
+    def _index_lock(self) -> Iterator[None]:
+        """Holds the lock of the index file across processes."""
+        with open(os.path.join(self.directory, self.LOCK_FILE), "a+b") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _load_index(self) -> Dict:
+        path = os.path.join(self.directory, self.INDEX_FILE)
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_index(self) -> None:
+        path = os.path.join(self.directory, self.INDEX_FILE)
+        tmp_path = _tmp_path(path)
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, path)
+
+
+class InstrumentCache:
+    """
+    In-process cache of instrument responses that expire after `ttl`.
+
+    When `path` is given the entries are also persisted to that JSON file,
+    so a new process starts with the responses of the previous one. Changes
+    are written at most once every `save_interval` seconds, and on `flush`,
+    `DatabaseClient.close` and interpreter exit.
+
+    Parameters:
+    - ttl (float): Seconds an entry stays valid.
+    - path (Optional[str]): JSON file the entries are persisted to.
+    - save_interval (float): Minimum seconds between writes of the file.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 3600.0,
+        path: Optional[str] = None,
+        save_interval: float = 5.0,
+    ):
+        if ttl <= 0:
+            raise ValueError("ttl must be positive.")
+
+        self.ttl = ttl
+        self.path = path
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._entries = self._load() if path is not None else {}
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+        if path is not None:
+            atexit.register(_flush_at_exit, weakref.ref(self))
+
+    @staticmethod
+    def key(operation: str, *parts: Any, ticker: Optional[str] = None) -> str:
+        # Datasets and vendors may be given as mbn enums or as strings,
+        # tickers are kept exact as they differ by case.
+        names = [str(p).lower() for p in parts]
+        if ticker is not None:
+            names.insert(0, ticker)
+        return "|".join([operation, *names])
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            if entry["expires"] <= time.time():
+                del self._entries[key]
+                return None
+
+            return entry["value"]
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = {
+                "value": value,
+                "expires": time.time() + self.ttl,
+            }
+            self._changed()
+
+    def put_many(self, items: Dict[str, Any]) -> None:
+        """Stores several entries at once."""
+        expires = time.time() + self.ttl
+        with self._lock:
+            for key, value in items.items():
+                self._entries[key] = {"value": value, "expires": expires}
+            self._changed()
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Removes the entry for `key`, or every entry if no key is given."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            self._changed()
+
+    def flush(self) -> None:
+        """Writes pending changes to `path`, if one is set."""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.path, "r") as f:
+                entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+        now = time.time()
+        return {k: e for k, e in entries.items() if e["expires"] > now}
+
+    def _changed(self) -> None:
+        if self.path is None:
+            return
+
+        # Batched, so resolving tickers one by one doesn't rewrite the file
+        # on every miss.
+        self._dirty = True
+        if time.monotonic() - self._saved_at >= self.save_interval:
+            self._save()
+
+    def _save(self) -> None:
+        tmp_path = _tmp_path(self.path)
+        with open(tmp_path, "w") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+
+def _flush_at_exit(ref: "weakref.ref") -> None:
+    cache = ref()
+    if cache is not None:
+        cache.flush()
+
+
+def _tmp_path(path: str) -> str:
+    # Unique per process and thread, as several may write the same file.
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def missing_ranges(
+    covered: List[Tuple[int, int]],
+    start: int,
+    end: int,
+) -> List[Tuple[int, int]]:
+    """Returns the parts of `[start, end)` not covered by any range."""
+    gaps = []
+    cursor = start
+
+    for range_start, range_end in sorted(covered):
+        if range_start > cursor:
+            gaps.append((cursor, min(range_start, end)))
+        cursor = max(cursor, range_end)
+        if cursor >= end:
+            break
+
+    if cursor < end:
+        gaps.append((cursor, end))
+
+    return [(s, e) for s, e in gaps if s < e]
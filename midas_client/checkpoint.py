@@ -0,0 +1,109 @@
+import os
+import json
+import numpy as np
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Optional
+from .stream import RECORD_LENGTH_MULTIPLIER, _header_dtype
+
+
+@dataclass
+class Checkpoint:
+    """
+    Progress of a resumable download, persisted next to the partial file.
+
+    Parameters:
+    - key (str): Cache key of the request the partial file belongs to.
+    - offset (int): Number of bytes of the partial file known to be complete.
+    - last_ts (Optional[int]): `ts_event` of the last record written.
+    - boundary (List[str]): Hex encoded records written with `last_ts`, used
+      to drop the duplicates sent again when the request is resumed.
+    """
+
+    key: str
+    offset: int = 0
+    last_ts: Optional[int] = None
+    boundary: List[str] = field(default_factory=list)
+    # Boundary records the re-issued request has yet to send again
+    _resent: Optional[Counter] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @classmethod
+    def load(cls, path: str, key: str) -> Optional["Checkpoint"]:
+        """Loads the checkpoint at `path` if it belongs to `key`."""
+        try:
+            with open(path, "r") as f:
+                checkpoint = cls(**json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError, TypeError):
+            return None
+
+        return checkpoint if checkpoint.key == key else None
+
+    def save(self, path: str) -> None:
+        state = {
+            k: v for k, v in self.__dict__.items() if not k.startswith("_")
+        }
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+    def resume(self) -> None:
+        """
+        Marks the start of a request re-issued from `last_ts`, whose first
+        records repeat those already written with that timestamp.
+        """
+        if self.last_ts is not None:
+            self._resent = Counter(self.boundary)
+
+    def advance(self, records: bytes) -> bytes:
+        """
+        Drops the records sent again after `resume` and returns the rest,
+        recording them as written.
+
+        Records are expected in `ts_event` order, as the server sends them.
+        """
+        if not records:
+            return records
+
+        record_size = records[0] * RECORD_LENGTH_MULTIPLIER
+        ts_event = np.frombuffer(records, dtype=_header_dtype(record_size))[
+            "ts_event"
+        ]
+        raw = np.frombuffer(records, dtype=f"V{record_size}")
+
+        if self._resent is not None:
+            # Repeats lead the stream, up to the first record not written
+            keep = ts_event > self.last_ts
+            resent = self._resent
+            for i in np.flatnonzero(ts_event == self.last_ts):
+                record = raw[i].tobytes().hex()
+                if resent is not None and resent[record]:
+                    resent[record] -= 1
+                else:
+                    keep[i] = True
+                    resent = None
+
+            if keep.any():
+                self._resent = None
+
+            records = raw[keep].tobytes()
+            ts_event = ts_event[keep]
+            raw = raw[keep]
+
+            if not records:
+                return records
+
+        last_ts = int(ts_event[-1])
+        tail = [r.tobytes().hex() for r in raw[ts_event == last_ts]]
+
+        if last_ts == self.last_ts:
+            self.boundary.extend(tail)
+        else:
+            self.last_ts = last_ts
+            self.boundary = tail
+
+        self.offset += len(records)
+        return records
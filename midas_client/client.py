@@ -1,15 +1,118 @@
-from dotenv import load_dotenv
-from .historical import HistoricalClient
-from .trading import TradingClient
-from .instrument import InstrumentClient
+from functools import cached_property, lru_cache
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from .cache import InstrumentCache, RecordCache
+    from .historical import HistoricalClient
+    from .instrument import InstrumentClient
+    from .metrics import MetricsSink
+    from .tracing import Tracer
+    from .policy import RequestPolicy
+    from .session import HttpSession
+    from .trading import TradingClient
+
+
+@lru_cache(maxsize=None)
+def _load_env() -> None:
+    from dotenv import load_dotenv
+
+    load_dotenv()
 
 
 class DatabaseClient:
-    def __init__(self):
-        load_dotenv()
+    """
+    Entry point to the historical, trading and instrument clients.
+
+    The session and each sub-client are built on first access, so a process
+    that only needs one of them never imports or sets up the others.
+    """
 
-        self.historical = HistoricalClient()
-        self.trading = TradingClient()
-        self.instrument = InstrumentClient()
+    def __init__(
+        self,
+        pool_size: int = 10,
+        keep_alive: bool = True,
+        cache: Optional["RecordCache"] = None,
+        compression: Optional[str] = None,
+        policy: Optional["RequestPolicy"] = None,
+        instrument_cache: Optional["InstrumentCache"] = None,
+        metrics: Optional["MetricsSink"] = None,
+        tracer: Optional["Tracer"] = None,
+    ):
+        if pool_size <= 0:
+            raise ValueError("pool_size must be a positive integer.")
+
+        if compression is not None:
+            from .compression import check_encoding
+
+            check_encoding(compression)
+
+        self._pool_size = pool_size
+        self._keep_alive = keep_alive
+        self._cache = cache
+        self._compression = compression
+        self._policy = policy
+        self._instrument_cache = instrument_cache
+        self._metrics = metrics
+        self._tracer = tracer
 
         # self.api_key = api_key
+
+    @cached_property
+    def session(self) -> "HttpSession":
+        # One pooled session shared by every sub-client, so the timeouts,
+        # retries and per-host circuit breakers of the policy apply to all
+        # of them.
+        from .policy import RequestPolicy
+        from .session import HttpSession
+
+        policy = self._policy if self._policy is not None else RequestPolicy()
+        return HttpSession(
+            pool_size=self._pool_size,
+            keep_alive=self._keep_alive,
+            policy=policy,
+            metrics=self._metrics,
+            tracer=self._tracer,
+        )
+
+    @cached_property
+    def historical(self) -> "HistoricalClient":
+        from .historical import HistoricalClient
+
+        _load_env()
+        return HistoricalClient(
+            session=self.session,
+            cache=self._cache,
+            compression=self._compression,
+        )
+
+    @cached_property
+    def trading(self) -> "TradingClient":
+        from .trading import TradingClient
+
+        _load_env()
+        return TradingClient(session=self.session)
+
+    @cached_property
+    def instrument(self) -> "InstrumentClient":
+        from .instrument import InstrumentClient
+
+        _load_env()
+        return InstrumentClient(
+            session=self.session, cache=self._instrument_cache
+        )
+
+    def close(self) -> None:
+        """
+        Closes every pooled connection and writes pending instrument cache
+        changes to its file.
+        """
+        if "session" in self.__dict__:
+            self.session.close()
+        if self._instrument_cache is not None:
+            self._instrument_cache.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,132 @@
+import gzip
+import zlib
+import requests
+from typing import Iterable, Iterator, Optional
+from urllib3.exceptions import (
+    DecodeError,
+    ProtocolError,
+    ReadTimeoutError,
+    SSLError,
+)
+
+try:
+    import zstandard
+except ImportError:  # zstd support is optional
+    zstandard = None
+
+# Content-Encoding values the client can produce and accept.
+ENCODINGS = ("gzip", "zstd")
+
+# Size of the raw reads made while decompressing a response.
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def check_encoding(encoding: Optional[str]) -> Optional[str]:
+    """
+    Validates a requested content encoding, making sure the libraries
+    needed to produce and decode it are installed.
+    """
+    if encoding is None:
+        return None
+
+    if encoding not in ENCODINGS:
+        raise ValueError(
+            f"Unsupported compression {encoding!r}, "
+            f"expected one of {ENCODINGS}."
+        )
+
+    if encoding == "zstd":
+        _zstd()
+
+    return encoding
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compresses `data` with the named HTTP content encoding."""
+    check_encoding(encoding)
+
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=6)
+
+    return zstandard.ZstdCompressor().compress(data)
+
+
+def compress_chunks(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """
+    Incrementally compresses a stream of chunks, yielding compressed output
+    as it becomes available without buffering the whole payload.
+    """
+    check_encoding(encoding)
+
+    if encoding == "gzip":
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    else:
+        compressor = zstandard.ZstdCompressor().compressobj()
+
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+
+    yield compressor.flush()
+
+
+def iter_decoded(response: requests.Response) -> Iterator[bytes]:
+    """
+    Iterates over a streamed response body, decompressing gzip or zstd
+    content chunk by chunk as it is received.
+
+    Decoding is done here rather than by urllib3 so zstd works regardless
+    of which zstd bindings the installed urllib3 expects.
+    """
+    encoding = response.headers.get("Content-Encoding", "").strip().lower()
+
+    if encoding not in ENCODINGS:
+        yield from response.iter_content(chunk_size=None)
+        return
+
+    if encoding == "gzip":
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        errors = (zlib.error,)
+    else:
+        decompressor = _zstd().ZstdDecompressor().decompressobj()
+        errors = (zstandard.ZstdError,)
+
+    try:
+        for chunk in _read_raw(response):
+            data = decompressor.decompress(chunk)
+            if data:
+                yield data
+
+        if encoding == "gzip":
+            data = decompressor.flush()
+            if data:
+                yield data
+    except errors as e:
+        raise requests.exceptions.ContentDecodingError(e)
+
+
+def _read_raw(response: requests.Response) -> Iterator[bytes]:
+    """
+    Reads the undecoded body, raising the same `requests` exceptions as
+    `Response.iter_content` for dropped connections and read timeouts.
+    """
+    try:
+        yield from response.raw.stream(READ_CHUNK_SIZE, decode_content=False)
+    except ProtocolError as e:
+        raise requests.exceptions.ChunkedEncodingError(e)
+    except DecodeError as e:
+        raise requests.exceptions.ContentDecodingError(e)
+    except ReadTimeoutError as e:
+        raise requests.ConnectionError(e)
+    except SSLError as e:
+        raise requests.exceptions.SSLError(e)
+
+
+def _zstd():
+    if zstandard is None:
+        raise ImportError(
+            "zstd compression requires the zstandard package, install it with "
+            "`pip install midas_client[zstd]`."
+        )
+    return zstandard
@@ -1,66 +1,780 @@
+import os
+import shutil
 import requests
-from typing import List
-from mbn import BufferStore, RetrieveParams
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from mbn import BufferStore, Metadata, RecordMsg, RetrieveParams
+from .arrays import pretty_array, read_array, records_to_array, to_array
+from .cache import RecordCache, missing_ranges
+from .checkpoint import Checkpoint
+from .ingest import (
+    INGEST_BATCH_SIZE,
+    BatchAck,
+    IngestSource,
+    iter_batches,
+    iter_encoded,
+    upload_ordered,
+)
+from .compression import (
+    check_encoding,
+    compress,
+    compress_chunks,
+    iter_decoded,
+)
+from .metrics import session_metrics
+from .stream import (
+    UPLOAD_CHUNK_SIZE,
+    ProgressCallback,
+    RecordFramer,
+    TransferMeter,
+    encode_chunks,
+    merge_metadata,
+    merge_records,
+    metered_chunks,
+    slice_records,
+    split_mbn,
+)
+from .session import HttpSession
+from .status import iter_status
+from .tracing import count, phase, propagate, timed_chunks, traced
 from .utils import load_url
 import json
 
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# Bytes written between checkpoints of a resumable download.
+CHECKPOINT_INTERVAL = 16 * 1024 * 1024
+
+# Bar width of each schema in nanoseconds; the server widens requested
+# windows to these boundaries, so shards must be split on them too.
+SCHEMA_INTERVALS = {
+    "Ohlcv1S": 1_000_000_000,
+    "Ohlcv1M": 60_000_000_000,
+    "Ohlcv1H": 3_600_000_000_000,
+    "Ohlcv1D": 86_400_000_000_000,
+    "Bbo1S": 1_000_000_000,
+    "Bbo1M": 60_000_000_000,
+}
+
 
 class HistoricalClient:
-    def __init__(self, api_url: str = ""):
+    def __init__(
+        self,
+        api_url: str = "",
+        session: Optional[requests.Session] = None,
+        cache: Optional[RecordCache] = None,
+        compression: Optional[str] = None,
+    ):
         if not api_url:
             api_url = load_url("HISTORICAL_URL")
 
         self.api_url = f"{api_url}/historical"
+        self.session = session if session is not None else HttpSession()
+        self.cache = cache
+        self.compression = check_encoding(compression)
         # self.api_key = api_key
 
-    def create_records(self, data: List[int]):
+    @traced
+    def create_records(
+        self,
+        data: List[int],
+        on_progress: Optional[ProgressCallback] = None,
+    ):
         """
         Stream loading main used for testing.
+
+        `on_progress` is called with a `StreamProgress` for every status
+        message the server sends back.
+        """
+        response, meter = self._post_records(data)
+        return self._read_status(response, meter, on_progress)
+
+    @traced
+    def stream_create_records(
+        self,
+        data: List[int],
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Iterator[Dict]:
+        """
+        Loads records, yielding each status message the server streams back
+        while they are being inserted.
+        """
+        response, meter = self._post_records(data)
+        yield from self._iter_status(response, meter, on_progress)
+
+    def _post_records(
+        self, data: List[int]
+    ) -> Tuple[requests.Response, TransferMeter]:
+        url = f"{self.api_url}/mbp/create/stream"
+
+        meter = TransferMeter()
+        body = json.dumps(data).encode("utf-8")
+        meter.bytes = len(body)
+        headers = {"Content-Type": "application/json"}
+
+        if self.compression is not None:
+            body = compress(body, self.compression)
+            headers["Content-Encoding"] = self.compression
+
+        response = self.session.post(
+            url, data=body, headers=headers, stream=True
+        )
+
+        if response.status_code != 200:
+            raise ValueError(f"Error while creating records : {response.text}")
+
+        return response, meter
+
+    @traced
+    def create_records_stream(
+        self,
+        data: Iterable[Union[bytes, RecordMsg]],
+        metadata: Optional[Metadata] = None,
+        chunk_size: int = UPLOAD_CHUNK_SIZE,
+        on_progress: Optional[ProgressCallback] = None,
+    ):
         """
+        Streams raw binary MBN to the server in `chunk_size` chunks.
+
+        `data` may yield encoded MBN byte chunks, `mbn` record objects or a
+        mix of both and is consumed lazily as the connection accepts data,
+        so memory stays flat regardless of the number of records. If the
+        stream does not start with encoded metadata, pass `metadata`.
 
+        `on_progress` is called with a `StreamProgress` after every chunk
+        sent and for every status message the server sends back.
+        """
         url = f"{self.api_url}/mbp/create/stream"
 
-        response = requests.post(url, json=data, stream=True)
+        meter = TransferMeter()
+        body = metered_chunks(
+            encode_chunks(data, chunk_size, metadata), meter, on_progress
+        )
+        headers = {"Content-Type": "application/octet-stream"}
+
+        if self.compression is not None:
+            body = compress_chunks(body, self.compression)
+            headers["Content-Encoding"] = self.compression
+
+        response = self.session.post(
+            url, data=body, headers=headers, stream=True
+        )
 
         if response.status_code != 200:
             raise ValueError(f"Error while creating records : {response.text}")
 
+        return self._read_status(response, meter, on_progress)
+
+    @traced
+    def ingest_records(
+        self,
+        sources: Iterable[IngestSource],
+        metadata: Metadata,
+        batch_size: int = INGEST_BATCH_SIZE,
+        workers: Optional[int] = None,
+        connections: int = 4,
+        on_ack: Optional[Callable[[BatchAck], None]] = None,
+    ) -> List[BatchAck]:
+        """
+        Bulk loads MBP-1 records from vendor files or NumPy arrays.
+
+        `sources` may be JSON files of vendor records (encoded on a pool of
+        `workers` processes), MBN files or arrays of `arrays.MBP1_DTYPE`.
+        Their records are regrouped into batches of `batch_size`, each
+        uploaded as its own stream over up to `connections` concurrent
+        requests; keep the session's `pool_size` at least as large.
+
+        Batches are acknowledged in order through `on_ack` and the returned
+        list. Once a batch fails no further batches are sent, and after the
+        ones in flight finish a `ValueError` names the failed batch.
+        """
+        batches = iter_batches(iter_encoded(sources, workers), batch_size)
+        return upload_ordered(
+            batches,
+            lambda batch: self.create_records_stream([batch], metadata),
+            connections,
+            on_ack,
+        )
+
+    def _read_status(
+        self,
+        response: requests.Response,
+        meter: TransferMeter,
+        on_progress: Optional[ProgressCallback] = None,
+    ):
         last_response = None
 
-        # Read the streamed content in chunks
-        for chunk in response.iter_content(chunk_size=None):
-            if chunk:  # filter out keep-alive chunks
-                try:
-                    chunk_data = json.loads(chunk.decode("utf-8"))
-                    last_response = chunk_data  # Keep updating with the latest parsed response
-                except json.JSONDecodeError as e:
-                    print(f"Failed to parse chunk as JSON: {e}")
+        # Keep updating with the latest parsed response
+        for chunk_data in self._iter_status(response, meter, on_progress):
+            last_response = chunk_data
 
         # Return the last response
         return last_response
 
-    def get_records(self, params: RetrieveParams):
-        url = f"{self.api_url}/mbp/get/stream"
+    def _iter_status(
+        self,
+        response: requests.Response,
+        meter: TransferMeter,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Iterator[Dict]:
+        return iter_status(
+            response,
+            meter,
+            session_metrics(self.session),
+            "records.upload",
+            on_progress,
+        )
 
-        # data = params.to_dict()
+    @traced
+    def get_records(
+        self,
+        params: RetrieveParams,
+        on_progress: Optional[ProgressCallback] = None,
+    ):
+        """
+        Retrieves the records matching `params`.
+
+        The response is framed record by record, so the server's closing
+        status message never removes payload data. `on_progress` is called
+        with a `StreamProgress` after every chunk received.
+        """
         # Deserialize JSON string into a Python dictionary
-        payload_dict = json.loads(params.to_json())  # json_payload)
-        response = requests.get(url, json=payload_dict, stream=True)
+        payload_dict = json.loads(params.to_json())
+
+        if self.cache is not None:
+            path = self.cache.get(payload_dict)
+            if path is not None:
+                return BufferStore.from_file(path)
+
+            return BufferStore(
+                self._get_cached_ranges(payload_dict, on_progress)
+            )
+
+        # BufferStore copies its input twice, so the blocks are joined once
+        # into the buffer it is built from rather than grown and copied.
+        data = b"".join(self._iter_stream(payload_dict, on_progress))
+        return BufferStore(data)
+
+    @traced
+    def get_records_array(
+        self,
+        params: RetrieveParams,
+        pretty: bool = False,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> np.ndarray:
+        """
+        Retrieves the records matching `params` as a NumPy structured array
+        of the schema's record layout (see `midas_client.arrays`), without
+        building a Python object per record.
+
+        With `pretty=True` prices are converted to float64 and timestamps to
+        `datetime64[ns]`; otherwise the array is a read-only view of the
+        received bytes with fixed-point prices and integer timestamps.
+        """
+        payload_dict = json.loads(params.to_json())
+
+        if self.cache is None:
+            metadata, records = self._fetch_records(payload_dict, on_progress)
+            array = records_to_array(metadata, records)
+        else:
+            path = self.cache.get(payload_dict)
+            if path is not None:
+                array = read_array(path)
+            else:
+                array = to_array(
+                    self._get_cached_ranges(payload_dict, on_progress)
+                )
+
+        if pretty:
+            with phase("decode"):
+                array = pretty_array(array)
+        return array
+
+    @traced
+    def get_records_to_file(
+        self,
+        params: RetrieveParams,
+        path: str,
+        on_progress: Optional[ProgressCallback] = None,
+        resume: bool = False,
+        retries: int = 3,
+    ) -> str:
+        """
+        Streams the records matching `params` straight to an MBN file at
+        `path`, one received block at a time, and returns the path.
+
+        The record set is never held in memory; read it back with
+        `BufferStore.from_file`. The file is only moved into place once the
+        stream completes, so a failed download never leaves a partial file.
+
+        With `resume=True` progress is checkpointed to `path + ".ckpt"` and
+        an interrupted stream is re-requested from the last record received,
+        up to `retries` times. If it still fails, the partial file and the
+        checkpoint are kept and calling again with `resume=True` continues
+        where the download stopped.
+        """
+        payload_dict = json.loads(params.to_json())
+
+        if self.cache is not None:
+            cached = self.cache.get(payload_dict)
+            if cached is not None:
+                shutil.copyfile(cached, path)
+                return path
+
+        part_path = f"{path}.part"
+
+        if resume:
+            self._download_resumable(
+                payload_dict, part_path, f"{path}.ckpt", retries, on_progress
+            )
+            os.replace(part_path, path)
+            # Downloads finishing before the first checkpoint never save one
+            if os.path.exists(f"{path}.ckpt"):
+                os.remove(f"{path}.ckpt")
+            return path
+
+        try:
+            with open(part_path, "wb") as f:
+                for block in self._iter_stream(payload_dict, on_progress):
+                    f.write(block)
+            os.replace(part_path, path)
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+
+        return path
+
+    def _download_resumable(
+        self,
+        payload_dict: Dict,
+        part_path: str,
+        checkpoint_path: str,
+        retries: int,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> None:
+        key = RecordCache.key(payload_dict)
+        checkpoint = Checkpoint.load(checkpoint_path, key)
+        if checkpoint is None or not os.path.exists(part_path):
+            checkpoint = Checkpoint(key)
+
+        attempt = 0
+        with open(part_path, "r+b" if checkpoint.offset else "wb") as f:
+            while True:
+                f.seek(checkpoint.offset)
+                f.truncate()
+
+                request = dict(payload_dict)
+                if checkpoint.last_ts is not None:
+                    request["start_ts"] = checkpoint.last_ts
+
+                framer = RecordFramer()
+                written = 0
+                checkpoint.resume()
+                try:
+                    blocks = self._iter_stream(request, on_progress, framer)
+                    metadata = next(blocks)
+                    if checkpoint.offset == 0:
+                        f.write(metadata)
+                        checkpoint.offset = len(metadata)
+
+                    for block in blocks:
+                        records = checkpoint.advance(block)
+                        f.write(records)
+                        written += len(records)
+
+                        if written >= CHECKPOINT_INTERVAL:
+                            self._save_checkpoint(
+                                f, checkpoint, checkpoint_path
+                            )
+                            written = 0
+                except requests.RequestException:
+                    if attempt >= retries:
+                        self._save_checkpoint(f, checkpoint, checkpoint_path)
+                        raise
+
+                if framer.finished:
+                    return
+
+                if attempt >= retries:
+                    self._save_checkpoint(f, checkpoint, checkpoint_path)
+                    raise ValueError(
+                        "Record stream was interrupted, call again with "
+                        "resume=True to continue the download."
+                    )
+
+                attempt += 1
+                self._save_checkpoint(f, checkpoint, checkpoint_path)
+
+    @staticmethod
+    def _save_checkpoint(f, checkpoint: Checkpoint, path: str) -> None:
+        # The data must be on disk before the checkpoint that points past it.
+        f.flush()
+        os.fsync(f.fileno())
+        checkpoint.save(path)
+
+    @traced
+    def stream_records(
+        self,
+        params: RetrieveParams,
+        batch_size: int = 10_000,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Iterator[List[RecordMsg]]:
+        """
+        Streams records matching `params`, decoding them as chunks arrive.
+
+        Complete records are decoded and yielded in batches of `batch_size`
+        (the last batch may be smaller), so memory use stays bounded by the
+        batch size rather than the size of the query. `on_progress` is
+        called with a `StreamProgress` after every chunk received.
+        """
+        payload_dict = json.loads(params.to_json())
+        for metadata, records in self._iter_batches(
+            payload_dict, batch_size, on_progress
+        ):
+            yield self._decode(metadata, records)
+
+    @traced
+    def stream_record_batches(
+        self,
+        params: RetrieveParams,
+        batch_size: int = 100_000,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Iterator["pa.RecordBatch"]:
+        """
+        Streams records matching `params` as Arrow record batches of up to
+        `batch_size` rows, converted as the download progresses. Requires
+        the `parquet` extra.
+        """
+        from .arrow import to_record_batch
+
+        payload_dict = json.loads(params.to_json())
+        for metadata, records in self._iter_batches(
+            payload_dict, batch_size, on_progress
+        ):
+            with phase("decode"):
+                batch = to_record_batch(metadata, records)
+            yield batch
+
+    @traced
+    def get_records_to_parquet(
+        self,
+        params: RetrieveParams,
+        root: str,
+        batch_size: int = 100_000,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> List[str]:
+        """
+        Downloads records matching `params` into a Parquet dataset under
+        `root`, partitioned by schema, symbol and date, and returns the
+        paths of the files written.
+
+        Batches of up to `batch_size` records are written while the download
+        is in progress, so only one batch is held in memory at a time.
+        Requires the `parquet` extra.
+        """
+        from .arrow import write_parquet
+
+        payload_dict = json.loads(params.to_json())
+        return write_parquet(
+            self._iter_batches(payload_dict, batch_size, on_progress), root
+        )
+
+    @staticmethod
+    def _decode(metadata: bytes, records: bytearray) -> List[RecordMsg]:
+        with phase("decode"):
+            return BufferStore(metadata + records).decode_to_array()
+
+    @traced
+    def get_records_parallel(
+        self,
+        params: RetrieveParams,
+        shards: int = 4,
+        max_workers: Optional[int] = None,
+    ) -> BufferStore:
+        """
+        Retrieves records by splitting `params` into up to `shards`
+        sub-queries, fetched concurrently and merged back into one
+        time-ordered `BufferStore`.
+
+        Multi-symbol queries are first split by symbol, the remaining shards
+        split the `start`/`end` window on schema interval boundaries.
+        """
+        if shards <= 0:
+            raise ValueError("shards must be a positive integer.")
+
+        payload_dict = json.loads(params.to_json())
+        groups = _split_payload(payload_dict, shards)
+        payloads = [p for group in groups for p in group]
+
+        with ThreadPoolExecutor(
+            max_workers=max_workers or len(payloads)
+        ) as pool:
+            fetch = propagate(self._fetch_records)
+            results = iter(list(pool.map(fetch, payloads)))
+
+        metadata = []
+        blocks = []
+        for group in groups:
+            # Time shards of one symbol group are disjoint and in order.
+            parts = [next(results) for _ in group]
+            metadata.extend(m for m, _ in parts)
+            blocks.append(b"".join(data for _, data in parts))
+
+        return BufferStore(merge_metadata(metadata) + merge_records(blocks))
+
+    def _get_cached_ranges(
+        self,
+        payload_dict: Dict,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> bytes:
+        """
+        Assembles the requested window per symbol from cached ranges,
+        fetching and caching only the sub-intervals not yet held locally.
+
+        Ranges are stitched on `ts_event`, widened to the schema's bar
+        interval the same way the server widens the request.
+        """
+        interval = SCHEMA_INTERVALS.get(payload_dict["schema"], 1)
+        start = payload_dict["start_ts"] - payload_dict["start_ts"] % interval
+        end = -(-payload_dict["end_ts"] // interval) * interval
+
+        metadata = []
+        blocks = []
+        for symbol in payload_dict["symbols"]:
+            symbol_dict = dict(
+                payload_dict, symbols=[symbol], start_ts=start, end_ts=end
+            )
+
+            # (start, end, records) of every piece covering the window
+            pieces = []
+            for seg_start, seg_end, path in self.cache.segments(symbol_dict):
+                with open(path, "rb") as f:
+                    seg_metadata, records = split_mbn(f.read())
+                metadata.append(seg_metadata)
+                pieces.append((seg_start, seg_end, records))
+
+            covered = [(s, e) for s, e, _ in pieces]
+            for gap_start, gap_end in missing_ranges(covered, start, end):
+                gap_dict = dict(
+                    symbol_dict, start_ts=gap_start, end_ts=gap_end
+                )
+                gap_metadata, records = self._fetch_records(
+                    gap_dict, on_progress
+                )
+                self.cache.put(gap_dict, gap_metadata + records)
+                metadata.append(gap_metadata)
+                pieces.append((gap_start, gap_end, records))
+
+            pieces.sort(key=lambda p: p[0])
+            cursor = start
+            parts = []
+            for piece_start, piece_end, records in pieces:
+                lo, hi = max(piece_start, cursor), min(piece_end, end)
+                if lo < hi:
+                    parts.append(slice_records(records, lo, hi))
+                cursor = max(cursor, hi)
+
+            block = b"".join(parts)
+            blocks.append(block)
+
+            if len(pieces) > 1:
+                # Coalesce into one range so repeat calls read a single file.
+                for piece_start, piece_end, _ in pieces:
+                    if start <= piece_start and piece_end <= end:
+                        self.cache.discard(
+                            dict(
+                                symbol_dict,
+                                start_ts=piece_start,
+                                end_ts=piece_end,
+                            )
+                        )
+                symbol_metadata = merge_metadata(
+                    metadata[-len(pieces) :], start, end
+                )
+                self.cache.put(symbol_dict, symbol_metadata + block)
+
+        return merge_metadata(metadata, start, end) + merge_records(blocks)
+
+    def _open_stream(self, payload_dict: Dict) -> requests.Response:
+        url = f"{self.api_url}/mbp/get/stream"
+
+        headers = {}
+        if self.compression is not None:
+            headers["Accept-Encoding"] = self.compression
+
+        response = self.session.get(
+            url, json=payload_dict, headers=headers, stream=True
+        )
 
         if response.status_code != 200:
             raise ValueError(
                 f"Instrument list retrieval failed: {response.text}"
             )
+        return response
+
+    def _fetch_records(
+        self,
+        payload_dict: Dict,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Tuple[bytes, bytes]:
+        blocks = self._iter_stream(payload_dict, on_progress)
+        metadata = next(blocks)
+        return metadata, b"".join(blocks)
+
+    def _iter_batches(
+        self,
+        payload_dict: Dict,
+        batch_size: int,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Iterator[Tuple[bytes, bytearray]]:
+        """
+        Yields `(metadata, records)` with `batch_size` complete records each
+        (the last batch may be smaller) as they are received, raising if the
+        server does not finish the stream.
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be a positive integer.")
+
+        framer = RecordFramer()
+        batch = bytearray()
+        batch_count = 0
+
+        try:
+            with self._open_stream(payload_dict) as response:
+                for chunk in timed_chunks(iter_decoded(response), "transfer"):
+                    framer.feed(chunk)
+
+                    while True:
+                        data, count = framer.take(batch_size - batch_count)
+                        if count == 0:
+                            break
+
+                        batch.extend(data)
+                        batch_count += count
+
+                        if batch_count == batch_size:
+                            yield framer.metadata, batch
+                            batch = bytearray()
+                            batch_count = 0
+
+                    if on_progress is not None:
+                        on_progress(framer.progress)
+
+                    if framer.finished:
+                        break
+        finally:
+            self._report_download(framer)
+
+        if framer.metadata is None:
+            raise ValueError("Record stream ended before the metadata header.")
+
+        if not framer.finished:
+            raise ValueError(
+                "Record stream ended before the end-of-stream message."
+            )
+
+        if batch_count:
+            yield framer.metadata, batch
+
+    def _iter_stream(
+        self,
+        payload_dict: Dict,
+        on_progress: Optional[ProgressCallback] = None,
+        framer: Optional[RecordFramer] = None,
+    ) -> Iterator[bytes]:
+        """
+        Yields the encoded metadata followed by blocks of complete records
+        as they are received, raising if the server does not finish the
+        stream. Pass a `framer` to check afterwards whether it finished
+        instead.
+        """
+        checked = framer is not None
+        if framer is None:
+            framer = RecordFramer()
+        sent_metadata = False
+
+        try:
+            with self._open_stream(payload_dict) as response:
+                for chunk in timed_chunks(iter_decoded(response), "transfer"):
+                    framer.feed(chunk)
+
+                    if framer.metadata is not None and not sent_metadata:
+                        sent_metadata = True
+                        yield framer.metadata
+
+                    data, count = framer.take()
+                    if count:
+                        yield data
+
+                    if on_progress is not None:
+                        on_progress(framer.progress)
+
+                    if framer.finished:
+                        break
+        finally:
+            self._report_download(framer)
+
+        if framer.metadata is None:
+            raise ValueError("Record stream ended before the metadata header.")
+
+        if not checked and not framer.finished:
+            raise ValueError(
+                "Record stream ended before the end-of-stream message."
+            )
+
+    def _report_download(self, framer: RecordFramer) -> None:
+        meter = framer.meter
+        meter.report(
+            session_metrics(self.session), "records.download", framer.finished
+        )
+        count(payload_bytes=meter.bytes, records=meter.records)
+
 
-        bin_data = bytearray()
+def _split_payload(payload_dict: Dict, shards: int) -> List[List[Dict]]:
+    """
+    Splits a retrieve payload into groups of disjoint symbols, each holding
+    consecutive, non-overlapping time windows.
+    """
+    symbols = payload_dict["symbols"]
+    n_groups = max(1, min(shards, len(symbols)))
+    n_windows = max(1, shards // n_groups)
 
-        # Read the streamed content in chunks
+    interval = SCHEMA_INTERVALS.get(payload_dict["schema"], 1)
+    start, end = payload_dict["start_ts"], payload_dict["end_ts"]
 
-        # Read the streamed content in chunks
-        for chunk in response.iter_content(chunk_size=None):
-            if chunk:  # filter out keep-alive or non-binary chunks
-                if b"Finished streaming all batches" in chunk:
-                    continue
-                bin_data.extend(chunk)
+    bounds = [start]
+    for i in range(1, n_windows):
+        bound = start + (end - start) * i // n_windows
+        bound -= bound % interval
+        if bounds[-1] < bound < end:
+            bounds.append(bound)
+    bounds.append(end)
 
-        return BufferStore(bytes(bin_data))
+    groups = []
+    for g in range(n_groups):
+        group_symbols = symbols[g::n_groups]
+        groups.append(
+            [
+                dict(
+                    payload_dict,
+                    symbols=group_symbols,
+                    start_ts=bounds[i],
+                    end_ts=bounds[i + 1],
+                )
+                for i in range(len(bounds) - 1)
+            ]
+        )
+    return groups
@@ -0,0 +1,170 @@
+import os
+import json
+import numpy as np
+from collections import deque
+from dataclasses import dataclass
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+from .arrays import MBP1_DTYPE, mbp1_from_dicts, read_array
+from .tracing import propagate
+
+# Records uploaded per request by the ingestion pipeline.
+INGEST_BATCH_SIZE = 500_000
+
+IngestSource = Union[str, np.ndarray]
+
+
+@dataclass(frozen=True)
+class BatchAck:
+    """
+    Acknowledgement of one uploaded batch.
+
+    Parameters:
+    - index (int): Position of the batch in the upload, starting at 0.
+    - records (int): Number of records in the batch.
+    - response (Optional[Dict]): Last status message returned for it.
+    """
+
+    index: int
+    records: int
+    response: Optional[Dict]
+
+
+def encode_json_file(path: str) -> bytes:
+    """
+    Encodes a JSON file of vendor MBP-1 records into MBN record bytes.
+    Runs in the worker processes of the pipeline.
+    """
+    with open(path, "r") as f:
+        records = json.load(f)
+    return mbp1_from_dicts(records).tobytes()
+
+
+def iter_encoded(
+    sources: Iterable[IngestSource],
+    workers: Optional[int] = None,
+) -> Iterator[np.ndarray]:
+    """
+    Yields the records of every source, in order, as MBP-1 arrays.
+
+    JSON files are parsed and encoded on a process pool, a few files ahead
+    of the upload. MBN files are memory-mapped and arrays used as is.
+    """
+    window = 2 * (workers or os.cpu_count() or 1)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque = deque()
+
+        def drain(limit: int) -> Iterator[np.ndarray]:
+            while len(pending) > limit:
+                item = pending.popleft()
+                if isinstance(item, Future):
+                    item = np.frombuffer(item.result(), dtype=MBP1_DTYPE)
+                yield item
+
+        for source in sources:
+            if isinstance(source, np.ndarray):
+                pending.append(_check_dtype(source))
+            elif source.endswith(".json"):
+                pending.append(pool.submit(encode_json_file, source))
+            else:
+                pending.append(_check_dtype(read_array(source)))
+
+            yield from drain(window)
+
+        yield from drain(0)
+
+
+def iter_batches(
+    arrays: Iterable[np.ndarray], batch_size: int
+) -> Iterator[bytes]:
+    """Regroups record arrays into encoded batches of `batch_size`."""
+    if batch_size <= 0:
+        raise ValueError("batch_size must be a positive integer.")
+
+    parts: List[np.ndarray] = []
+    count = 0
+    for array in arrays:
+        start = 0
+        while start < len(array):
+            take = min(batch_size - count, len(array) - start)
+            parts.append(array[start : start + take])
+            count += take
+            start += take
+
+            if count == batch_size:
+                yield b"".join(p.tobytes() for p in parts)
+                parts = []
+                count = 0
+
+    if count:
+        yield b"".join(p.tobytes() for p in parts)
+
+
+def upload_ordered(
+    batches: Iterable[bytes],
+    upload: Callable[[bytes], Optional[Dict]],
+    connections: int,
+    on_ack: Optional[Callable[[BatchAck], None]] = None,
+) -> List[BatchAck]:
+    """
+    Uploads batches over up to `connections` concurrent requests while
+    acknowledging them strictly in batch order.
+
+    No new batch is started once one fails. Batches already in flight are
+    still awaited and acknowledged if they succeed, then a `ValueError`
+    names the first failed batch, so every committed batch is reported.
+    """
+    if connections <= 0:
+        raise ValueError("connections must be a positive integer.")
+
+    acks: List[BatchAck] = []
+    failed: Optional[str] = None
+
+    def acknowledge(index: int, records: int, future: Future) -> None:
+        nonlocal failed
+        try:
+            response = future.result()
+        except Exception as e:
+            failed = failed or f"Batch {index} failed: {e}"
+            return
+
+        if response is not None and response.get("status") == "failed":
+            failed = failed or f"Batch {index} failed: {response}"
+            return
+
+        ack = BatchAck(index, records, response)
+        acks.append(ack)
+        if on_ack is not None:
+            on_ack(ack)
+
+    upload = propagate(upload)
+    with ThreadPoolExecutor(max_workers=connections) as pool:
+        in_flight: deque = deque()
+        for index, batch in enumerate(batches):
+            if failed is not None:
+                break
+
+            in_flight.append(
+                (index, _record_count(batch), pool.submit(upload, batch))
+            )
+            while len(in_flight) >= connections:
+                acknowledge(*in_flight.popleft())
+
+        while in_flight:
+            acknowledge(*in_flight.popleft())
+
+    if failed is not None:
+        raise ValueError(failed)
+
+    return acks
+
+
+def _record_count(batch: bytes) -> int:
+    return len(batch) // MBP1_DTYPE.itemsize
+
+
+def _check_dtype(array: np.ndarray) -> np.ndarray:
+    if array.dtype != MBP1_DTYPE:
+        raise ValueError("Only MBP-1 records can be ingested.")
+    return array
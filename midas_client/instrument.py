@@ -1,43 +1,165 @@
 import requests
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from .cache import InstrumentCache
+from .session import HttpSession
+from .tracing import phase, traced
 from .utils import load_url
-from mbn import Dataset, Vendors
+
+if TYPE_CHECKING:
+    # Only used in annotations, so instrument lookups don't load mbn.
+    from mbn import Dataset, Vendors
+
+# Statuses returned by servers without the bulk lookup endpoint.
+# Validation errors (400, 422) are the request's fault, not the endpoint's.
+BULK_UNSUPPORTED_STATUS = (404, 405)
 
 
 class InstrumentClient:
-    def __init__(self, api_url: str = ""):
+    def __init__(
+        self,
+        api_url: str = "",
+        session: Optional[requests.Session] = None,
+        cache: Optional[InstrumentCache] = None,
+    ):
         if not api_url:
             api_url = load_url("INSTRUMENT_URL")
 
         self.api_url = f"{api_url}/instruments"
+        self.session = session if session is not None else HttpSession()
+        self.cache = cache
+        self._bulk_lookup = True
 
-    def get_instrument(self, ticker: str, dataset: Dataset):
+    @traced
+    def get_instrument(self, ticker: str, dataset: "Dataset"):
         url = f"{self.api_url}/get"
         payload = (ticker, dataset)
-        response = requests.get(url, json=payload)
+        key = InstrumentCache.key("get", dataset, ticker=ticker)
+        return self._get(url, payload, key)
 
-        if response.status_code != 200:
-            raise ValueError(
-                f"Instrument list retrieval failed: {response.text}"
+    @traced
+    def list_dataset_instruments(self, dataset: "Dataset"):
+        url = f"{self.api_url}/list_dataset"
+        key = InstrumentCache.key("list_dataset", dataset)
+        return self._get(url, dataset, key)
+
+    @traced
+    def list_vendor_instruments(self, vendor: "Vendors", dataset: "Dataset"):
+        url = f"{self.api_url}/list_vendor"
+        payload = (vendor, dataset)
+        key = InstrumentCache.key("list_vendor", vendor, dataset)
+        return self._get(url, payload, key)
+
+    @traced
+    def get_instruments(
+        self, tickers: List[str], dataset: "Dataset"
+    ) -> Dict[str, Dict]:
+        """
+        Looks up several tickers at once, returning the instrument of each
+        ticker found keyed by ticker.
+
+        The tickers are sent in one bulk request. Servers without the bulk
+        endpoint are remembered and answered by filtering a single
+        `list_dataset_instruments` response instead. With a cache set,
+        tickers already cached are not requested again and the results are
+        cached for `get_instrument`.
+        """
+        found = {}
+        missing = []
+        for ticker in dict.fromkeys(tickers):
+            cached = self._cached(
+                InstrumentCache.key("get", dataset, ticker=ticker)
             )
-        return response.json()
+            if cached is not None and cached["data"]:
+                found[ticker] = cached["data"][0]
+            else:
+                missing.append(ticker)
 
-    def list_dataset_instruments(self, dataset: Dataset):
-        url = f"{self.api_url}/list_dataset"
-        response = requests.get(url, json=dataset)
+        if not missing:
+            return found
 
-        if response.status_code != 200:
-            raise ValueError(
-                f"Instrument list retrieval failed: {response.text}"
+        instruments = None
+        if self._bulk_lookup:
+            url = f"{self.api_url}/get_many"
+            response = self.session.get(url, json=(missing, dataset))
+
+            if response.status_code in BULK_UNSUPPORTED_STATUS:
+                self._bulk_lookup = False
+            elif response.status_code != 200:
+                raise ValueError(
+                    f"Instrument list retrieval failed: {response.text}"
+                )
+            else:
+                with phase("decode"):
+                    instruments = response.json()["data"]
+
+        if instruments is None:
+            instruments = self.list_dataset_instruments(dataset)["data"]
+
+        wanted = set(missing)
+        resolved = {
+            i["ticker"]: i for i in instruments if i["ticker"] in wanted
+        }
+
+        if self.cache is not None:
+            self.cache.put_many(
+                {
+                    InstrumentCache.key("get", dataset, ticker=ticker): {
+                        "code": 200,
+                        "data": [instrument],
+                    }
+                    for ticker, instrument in resolved.items()
+                }
             )
-        return response.json()
 
-    def list_vendor_instruments(self, vendor: Vendors, dataset: Dataset):
-        url = f"{self.api_url}/list_vendor"
-        payload = (vendor, dataset)
-        response = requests.get(url, json=payload)
+        found.update(resolved)
+        return found
+
+    @traced
+    def instrument_maps(
+        self, dataset: "Dataset"
+    ) -> Tuple[Dict[str, int], Dict[int, str]]:
+        """
+        Maps every ticker of `dataset` to its instrument id and every id
+        back to its ticker, both from one `list_dataset_instruments` call.
+        """
+        instruments = self.list_dataset_instruments(dataset)["data"]
+        ticker_to_id = {i["ticker"]: i["instrument_id"] for i in instruments}
+        id_to_ticker = {i["instrument_id"]: i["ticker"] for i in instruments}
+        return ticker_to_id, id_to_ticker
+
+    @traced
+    def ticker_to_id(self, dataset: "Dataset") -> Dict[str, int]:
+        """Maps every ticker of `dataset` to its instrument id."""
+        return self.instrument_maps(dataset)[0]
+
+    @traced
+    def id_to_ticker(self, dataset: "Dataset") -> Dict[int, str]:
+        """Maps every instrument id of `dataset` to its ticker."""
+        return self.instrument_maps(dataset)[1]
+
+    def _get(self, url: str, payload: Any, key: str) -> Dict:
+        """
+        Sends the request unless a cache is set and still holds its
+        response.
+        """
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        response = self.session.get(url, json=payload)
 
         if response.status_code != 200:
             raise ValueError(
                 f"Instrument list retrieval failed: {response.text}"
             )
-        return response.json()
+
+        with phase("decode"):
+            data = response.json()
+        if self.cache is not None:
+            self.cache.put(key, data)
+        return data
+
+    def _cached(self, key: str) -> Optional[Dict]:
+        if self.cache is None:
+            return None
+        return self.cache.get(key)
@@ -0,0 +1,151 @@
+import os
+import heapq
+import struct
+import tempfile
+import numpy as np
+from typing import Iterable, Iterator, List, Tuple, Union
+from mbn import BufferStore, RecordMsg
+from .arrays import read_array, read_metadata, to_array
+from .stream import METADATA_PREFIX_SIZE, merge_metadata
+
+# Records taken from each source per merge step.
+MERGE_BLOCK_SIZE = 65_536
+
+Source = Union[str, bytes, BufferStore]
+
+
+def merge_arrays(
+    arrays: List[np.ndarray],
+    key: str = "ts_event",
+    block_size: int = MERGE_BLOCK_SIZE,
+) -> Iterator[np.ndarray]:
+    """
+    Lazily merges record arrays that are each sorted by `key` into blocks
+    of records ordered by `key` across all of them.
+
+    A heap holds every source ordered by the last `key` of its current
+    block of `block_size` records. Each step emits, from every source, the
+    records up to the smallest of those keys, so at least one block is
+    consumed per step and memory stays bounded by one block per source.
+    Records with equal keys in different sources are not ordered between
+    sources.
+    """
+    if block_size <= 0:
+        raise ValueError("block_size must be a positive integer.")
+
+    if not arrays:
+        return
+
+    if len({a.dtype for a in arrays}) > 1:
+        raise ValueError("Only records of a single schema can be merged.")
+
+    dtype = arrays[0].dtype
+    void = f"V{dtype.itemsize}"
+
+    keys = []
+    for array in arrays:
+        if key not in (array.dtype.names or ()):
+            raise ValueError(f"Records have no {key!r} field to merge on.")
+        keys.append(array[key])
+
+    cursors = [0] * len(arrays)
+    ends = [0] * len(arrays)
+    heap: List[Tuple[np.generic, int]] = []
+
+    def next_block(i: int) -> None:
+        start = cursors[i]
+        end = min(start + block_size, len(arrays[i]))
+        if start == end:
+            return
+
+        # Include the previous record to check order across blocks too.
+        block = keys[i][max(start - 1, 0) : end]
+        if np.any(block[1:] < block[:-1]):
+            raise ValueError(f"Source {i} is not sorted by {key!r}.")
+
+        # Keys stay numpy scalars, Python ints are compared as floats.
+        ends[i] = end
+        heapq.heappush(heap, (block[-1], i))
+
+    for i in range(len(arrays)):
+        next_block(i)
+
+    while heap:
+        frontier = heap[0][0]
+
+        parts = []
+        for _, i in heap:
+            start = cursors[i]
+            stop = start + int(
+                np.searchsorted(
+                    keys[i][start : ends[i]], frontier, side="right"
+                )
+            )
+            if stop > start:
+                parts.append(arrays[i][start:stop])
+                cursors[i] = stop
+
+        # Every block ending at the frontier was emitted in full. Reload
+        # them only once all are popped, a next block holding only records
+        # at the frontier is emitted by the next step.
+        finished = []
+        while heap and heap[0][0] == frontier:
+            finished.append(heapq.heappop(heap)[1])
+        for i in finished:
+            next_block(i)
+
+        if len(parts) == 1:
+            yield parts[0]
+        else:
+            # Merge raw records, concatenating structured arrays would
+            # drop the padding between fields.
+            order = np.argsort(
+                np.concatenate([p[key] for p in parts]), kind="stable"
+            )
+            raw = np.concatenate([p.view(void) for p in parts])
+            yield raw[order].view(dtype)
+
+
+def iter_merged(
+    sources: Iterable[Source],
+    key: str = "ts_event",
+    block_size: int = MERGE_BLOCK_SIZE,
+) -> Iterator[List[RecordMsg]]:
+    """
+    Merges `BufferStore`s, encoded MBN buffers or MBN file paths of the same
+    schema into one stream ordered by `key` (`ts_event` or `ts_recv`),
+    yielding the records lazily as decoded batches.
+
+    Files are memory-mapped, so only the blocks being merged are read;
+    stores are written to a temporary file first.
+    """
+    # Memory-mapped spool files can't be removed on every platform.
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as spool:
+        metadata = []
+        arrays = []
+        for n, source in enumerate(sources):
+            if isinstance(source, BufferStore):
+                # Stores only expose their data by writing it to a file.
+                path = os.path.join(spool, f"{n}.bin")
+                source.write_to_file(path)
+                source = path
+
+            source_metadata, array = _load(source)
+            metadata.append(source_metadata)
+            arrays.append(array)
+
+        if not arrays:
+            return
+
+        merged_metadata = merge_metadata(metadata)
+        for block in merge_arrays(arrays, key, block_size):
+            store = BufferStore(merged_metadata + block.tobytes())
+            yield store.decode_to_array()
+
+
+def _load(source: Union[str, bytes]) -> Tuple[bytes, np.ndarray]:
+    if isinstance(source, str):
+        return read_metadata(source), read_array(source)
+
+    (length,) = struct.unpack_from("<H", source)
+    return source[: METADATA_PREFIX_SIZE + length], to_array(source)
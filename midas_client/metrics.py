@@ -0,0 +1,77 @@
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+Tags = Optional[Dict[str, str]]
+
+
+class MetricsSink:
+    """
+    Receives the counters and timings recorded by the clients.
+
+    The base sink discards everything; subclass it to forward metrics to
+    StatsD, Prometheus or any other backend. Methods may be called from
+    several threads at once.
+    """
+
+    def increment(self, name: str, value: float = 1, tags: Tags = None):
+        """Adds `value` to the counter `name`."""
+
+    def observe(self, name: str, value: float, tags: Tags = None):
+        """Records one measurement, e.g. a duration, of `name`."""
+
+
+class InMemoryMetrics(MetricsSink):
+    """
+    Keeps counters and observations in memory, keyed by name and tags.
+
+    Useful in tests and for quick diagnostics, e.g.
+    `metrics.counter("stream.bytes", operation="records.download")`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[Tuple[str, tuple], float] = defaultdict(float)
+        self.observations: Dict[Tuple[str, tuple], List[float]] = defaultdict(
+            list
+        )
+
+    def increment(self, name: str, value: float = 1, tags: Tags = None):
+        with self._lock:
+            self.counters[(name, _key(tags))] += value
+
+    def observe(self, name: str, value: float, tags: Tags = None):
+        with self._lock:
+            self.observations[(name, _key(tags))].append(value)
+
+    def counter(self, name: str, **tags: str) -> float:
+        """Sum of the counter `name` over every tag set containing `tags`."""
+        with self._lock:
+            return sum(
+                value
+                for (n, key), value in self.counters.items()
+                if n == name and set(tags.items()) <= set(key)
+            )
+
+    def values(self, name: str, **tags: str) -> List[float]:
+        """Observations of `name` over every tag set containing `tags`."""
+        with self._lock:
+            return [
+                value
+                for (n, key), values in self.observations.items()
+                if n == name and set(tags.items()) <= set(key)
+                for value in values
+            ]
+
+
+# Sink used when a session has none configured.
+NULL_METRICS = MetricsSink()
+
+
+def session_metrics(session) -> MetricsSink:
+    """Returns the sink of a client session, if it has one."""
+    return getattr(session, "metrics", None) or NULL_METRICS
+
+
+def _key(tags: Tags) -> tuple:
+    return tuple(sorted(tags.items())) if tags else ()
@@ -0,0 +1,115 @@
+import time
+import random
+import threading
+import requests
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+# HTTP methods that can be safely repeated after a failure.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of sending a request while the circuit is open."""
+
+
+@dataclass
+class RequestPolicy:
+    """
+    Timeout, retry and circuit breaker settings applied to every request.
+
+    Parameters:
+    - connect_timeout (Optional[float]): Seconds to wait for a connection.
+    - read_timeout (Optional[float]): Seconds to wait for each read from
+      the server, including between chunks of a streamed response.
+    - retries (int): Number of times an idempotent request is retried after
+      a connection error, timeout or `retry_statuses` response.
+    - backoff (float): Base delay in seconds, doubled on every retry. The
+      actual delay is drawn uniformly up to it ("full jitter").
+    - max_backoff (float): Upper bound of the delay between retries.
+    - retry_statuses (Tuple[int, ...]): Response statuses treated as
+      transient failures.
+    - failure_threshold (int): Consecutive failures that open the circuit.
+    - reset_timeout (float): Seconds the circuit stays open before a single
+      trial request is let through.
+    """
+
+    connect_timeout: Optional[float] = 10.0
+    read_timeout: Optional[float] = 300.0
+    retries: int = 3
+    backoff: float = 0.5
+    max_backoff: float = 30.0
+    retry_statuses: Tuple[int, ...] = (429, 500, 502, 503, 504)
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+
+    def __post_init__(self):
+        if self.retries < 0:
+            raise ValueError("retries must be a non-negative integer.")
+        if self.failure_threshold <= 0:
+            raise ValueError("failure_threshold must be a positive integer.")
+
+    @property
+    def timeout(self) -> Tuple[Optional[float], Optional[float]]:
+        return (self.connect_timeout, self.read_timeout)
+
+    def delay(self, attempt: int) -> float:
+        """Jittered delay before retry number `attempt` (starting at 0)."""
+        ceiling = min(self.max_backoff, self.backoff * 2**attempt)
+        return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a server that keeps failing.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    requests fail immediately with `CircuitOpenError`. Once `reset_timeout`
+    has passed one trial request is allowed; its success closes the circuit
+    and its failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def before_request(self) -> bool:
+        """Raises if the circuit is open, returns whether this is a trial."""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+
+            elapsed = time.monotonic() - self._opened_at
+            if elapsed < self.reset_timeout or self._trial:
+                raise CircuitOpenError(
+                    f"Circuit open after {self.failures} consecutive "
+                    "failures, not sending request."
+                )
+            self._trial = True
+            return True
+
+    def cancel_trial(self) -> None:
+        """Lets another trial through after one ended without an outcome."""
+        with self._lock:
+            self._trial = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial = False
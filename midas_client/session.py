@@ -0,0 +1,185 @@
+import time
+import threading
+import requests
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from .metrics import MetricsSink
+from .policy import IDEMPOTENT_METHODS, CircuitBreaker, RequestPolicy
+from .tracing import Span, Tracer, TracingAdapter, current_span, phase
+
+
+class HttpSession(requests.Session):
+    """
+    Connection-pooled session shared by the historical, trading and
+    instrument clients.
+
+    Parameters:
+    - pool_size (int): Maximum number of connections kept open per host.
+    - keep_alive (bool): Reuse connections between requests. When False every
+      request asks the server to close its connection once it completes.
+    - policy (Optional[RequestPolicy]): Timeouts, retries and circuit breaker
+      applied to every request, with one circuit per host. Without one
+      requests are sent once and wait indefinitely.
+    - metrics (Optional[MetricsSink]): Sink receiving request counts,
+      errors, retries and response times of every request, along with the
+      transfer totals of the clients' streaming calls.
+    - tracer (Optional[Tracer]): Records a span with the phase timings and
+      payload sizes of every client call, or of every request made outside
+      one.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        keep_alive: bool = True,
+        policy: Optional[RequestPolicy] = None,
+        metrics: Optional[MetricsSink] = None,
+        tracer: Optional[Tracer] = None,
+    ):
+        super().__init__()
+
+        if pool_size <= 0:
+            raise ValueError("pool_size must be a positive integer.")
+
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.policy = policy
+        self.metrics = metrics if metrics is not None else MetricsSink()
+        self.tracer = tracer
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
+
+        adapter_cls = HTTPAdapter if tracer is None else TracingAdapter
+        adapter = adapter_cls(
+            pool_connections=pool_size, pool_maxsize=pool_size
+        )
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+        self.headers["Connection"] = "keep-alive" if keep_alive else "close"
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        if self.policy is None:
+            return self._send(method, url, **kwargs)
+
+        kwargs.setdefault("timeout", self.policy.timeout)
+        retries = (
+            self.policy.retries if method.upper() in IDEMPOTENT_METHODS else 0
+        )
+
+        breaker = self.breaker(url)
+        attempt = 0
+        while True:
+            trial = breaker.before_request()
+
+            try:
+                response = self._send(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                breaker.record_failure()
+                if attempt >= retries:
+                    raise
+            except BaseException:
+                # Says nothing about the server, but must not keep the
+                # circuit waiting on a trial that already ended.
+                if trial:
+                    breaker.cancel_trial()
+                raise
+            else:
+                if response.status_code not in self.policy.retry_statuses:
+                    breaker.record_success()
+                    return response
+
+                breaker.record_failure()
+                if attempt >= retries:
+                    return response
+                response.close()
+
+            self.metrics.increment(
+                "http.retries", tags={"method": method.upper()}
+            )
+            time.sleep(self.policy.delay(attempt))
+            attempt += 1
+
+    def breaker(self, url: str) -> Optional[CircuitBreaker]:
+        """
+        The circuit breaker of the host of `url`, so a failing server does not
+        stop requests to the others. None without a policy.
+        """
+        if self.policy is None:
+            return None
+
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+        with self._breakers_lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(
+                    self.policy.failure_threshold, self.policy.reset_timeout
+                )
+        return breaker
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        # Bodies are read here rather than by requests, so the wait for the
+        # response headers and the transfer of the body are timed apart.
+        stream = kwargs.pop("stream", False)
+        tags = {"method": method.upper()}
+
+        with self._span(method, url) as span:
+            started = time.perf_counter()
+            try:
+                response = super().request(method, url, stream=True, **kwargs)
+            except requests.RequestException as e:
+                self.metrics.increment(
+                    "http.errors", tags=dict(tags, error=type(e).__name__)
+                )
+                raise
+
+            elapsed = time.perf_counter() - started
+            self.metrics.observe("http.response_seconds", elapsed, tags)
+            self.metrics.increment(
+                "http.requests",
+                tags=dict(tags, status=str(response.status_code)),
+            )
+
+            if not stream:
+                with phase("transfer"):
+                    response.content
+
+            if span is not None:
+                span.add_phase("ttfb", elapsed)
+                _annotate(span, response, stream)
+
+        return response
+
+    @contextmanager
+    def _span(self, method: str, url: str) -> Iterator[Optional[Span]]:
+        """The active span, or a new one for requests made outside one."""
+        span = current_span() if self.tracer is not None else None
+        if self.tracer is None or span is not None:
+            yield span
+            return
+
+        with self.tracer.span(
+            f"{method.upper()} {urlsplit(url).path}"
+        ) as span:
+            yield span
+
+
+def _annotate(span: Span, response: requests.Response, stream: bool) -> None:
+    request = response.request
+    span.annotate(
+        **{
+            "http.method": request.method,
+            "http.path": urlsplit(request.url).path,
+            "http.status_code": response.status_code,
+        }
+    )
+    span.count(**{"http.requests": 1})
+
+    # Streamed bodies are counted by the clients as they are transferred.
+    if isinstance(request.body, (bytes, str)):
+        span.count(request_bytes=len(request.body))
+    if not stream:
+        span.count(response_bytes=len(response.content or b""))
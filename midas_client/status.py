@@ -0,0 +1,116 @@
+import re
+import json
+import codecs
+import warnings
+import requests
+from typing import Dict, Iterator, List, Optional
+from .metrics import MetricsSink
+from .stream import ProgressCallback, TransferMeter
+from .tracing import count, phase, timed_chunks
+
+_WHITESPACE = re.compile(r"\s*")
+
+_DECODER = json.JSONDecoder()
+
+
+class StatusParser:
+    """
+    Incrementally parses the JSON status messages streamed back by the
+    create endpoints.
+
+    Messages may be concatenated or newline-delimited and split across
+    chunks at any byte, even inside a multi-byte character; each one is
+    returned once all of it has arrived. A complete line that is not JSON
+    is skipped with a warning and kept in `skipped`.
+    """
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._text = ""
+        self.skipped: List[str] = []
+
+    def feed(self, chunk: bytes) -> List[Dict]:
+        """Adds a chunk, returning the messages it completes."""
+        text = self._text + self._decoder.decode(chunk)
+        messages = []
+        pos = 0
+
+        while True:
+            pos = _WHITESPACE.match(text, pos).end()
+            if pos == len(text):
+                break
+
+            try:
+                message, pos = _DECODER.raw_decode(text, pos)
+            except json.JSONDecodeError as e:
+                end = text.find("\n", pos)
+                if end == -1 or e.pos > end:
+                    break  # The rest of the message is still to come
+
+                line = text[pos:end].rstrip("\r")
+                self.skipped.append(line)
+                warnings.warn(
+                    f"Skipped a status line that is not JSON: {line[:200]!r}"
+                )
+                pos = end + 1
+                continue
+
+            messages.append(message)
+
+        self._text = text[pos:]
+        return messages
+
+    def close(self) -> None:
+        """Checks that the stream did not end inside a message."""
+        rest = self._text + self._decoder.decode(b"", final=True)
+        if rest.strip():
+            raise ValueError(
+                f"Status stream ended inside a message: {rest[:200]!r}"
+            )
+
+
+def iter_status(
+    response: requests.Response,
+    meter: TransferMeter,
+    metrics: MetricsSink,
+    operation: str,
+    on_progress: Optional[ProgressCallback] = None,
+) -> Iterator[Dict]:
+    """
+    Yields every status message of a streamed create response as it
+    arrives, reporting each to `on_progress` and the totals of the request
+    to `metrics` once the stream ends.
+    """
+    parser = StatusParser()
+    finished = False
+
+    try:
+        chunks = response.iter_content(chunk_size=None)
+        for chunk in timed_chunks(chunks, "transfer"):
+            meter.responded()
+            with phase("decode"):
+                messages = parser.feed(chunk)
+
+            for message in messages:
+                meter.messages += 1
+                if on_progress is not None:
+                    on_progress(meter.progress(False, message))
+                yield message
+
+        parser.close()
+        finished = True
+    finally:
+        response.close()
+        meter.report(metrics, operation, finished)
+        if parser.skipped:
+            metrics.increment(
+                "stream.invalid_messages",
+                len(parser.skipped),
+                {"operation": operation},
+            )
+        count(payload_bytes=meter.bytes)
+        if meter.records:
+            count(records=meter.records)
+
+    if on_progress is not None:
+        on_progress(meter.progress(True))
@@ -0,0 +1,485 @@
+import time
+import struct
+import numpy as np
+from dataclasses import dataclass
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from mbn import Metadata, PyRecordEncoder, RecordMsg, SymbolMap
+from .metrics import MetricsSink
+
+# Size of the little-endian u16 length prefix written before the metadata.
+METADATA_PREFIX_SIZE = 2
+
+# Record lengths are stored in the first header byte in units of 4 bytes.
+RECORD_LENGTH_MULTIPLIER = 4
+
+# Size of the `RecordHeader` shared by every MBN record.
+RECORD_HEADER_SIZE = 24
+
+# Offset of `ts_event` within the `RecordHeader`.
+TS_EVENT_OFFSET = 8
+
+# Default size of the chunks uploaded to the server.
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Number of record objects encoded together while uploading.
+ENCODE_BATCH_SIZE = 10_000
+
+# Status message appended by the server once every batch has been sent.
+END_OF_STREAM = b"Finished streaming all batches"
+
+
+@dataclass(frozen=True)
+class StreamProgress:
+    """
+    Snapshot of a streaming request.
+
+    Parameters:
+    - records (int): Records received, or sent for uploads, so far.
+    - bytes (int): Decoded payload bytes received, or sent, so far.
+    - finished (bool): Whether the stream completed.
+    - elapsed (float): Seconds since the request was started.
+    - first_byte (Optional[float]): Seconds from the start of the request to
+      the first byte of the response body, None until it arrives.
+    - message (Optional[Dict]): Status message just received from the
+      server, for uploads.
+    """
+
+    records: int
+    bytes: int
+    finished: bool
+    elapsed: float = 0.0
+    first_byte: Optional[float] = None
+    message: Optional[Dict] = None
+
+    @property
+    def throughput(self) -> float:
+        """Bytes per second over the whole request so far."""
+        return self.bytes / self.elapsed if self.elapsed > 0 else 0.0
+
+
+ProgressCallback = Callable[[StreamProgress], None]
+
+
+class TransferMeter:
+    """
+    Counts the bytes and records of one streaming request and times it from
+    creation.
+
+    A late first byte points at the server, a low throughput after it at
+    the network or the client, and progress without new bytes at a stalled
+    stream.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_byte: Optional[float] = None
+        self.bytes = 0
+        self.records = 0
+        self.messages = 0
+
+    def responded(self) -> None:
+        """Marks the arrival of the first response byte."""
+        if self.first_byte is None:
+            self.first_byte = time.perf_counter() - self.started
+
+    def progress(
+        self, finished: bool, message: Optional[Dict] = None
+    ) -> StreamProgress:
+        return StreamProgress(
+            self.records,
+            self.bytes,
+            finished,
+            time.perf_counter() - self.started,
+            self.first_byte,
+            message,
+        )
+
+    def report(
+        self, metrics: MetricsSink, operation: str, finished: bool
+    ) -> None:
+        """Exports the totals of the request to `metrics`."""
+        tags = {"operation": operation}
+        elapsed = time.perf_counter() - self.started
+
+        metrics.increment("stream.bytes", self.bytes, tags)
+        metrics.increment("stream.records", self.records, tags)
+        if self.messages:
+            metrics.increment("stream.messages", self.messages, tags)
+        metrics.observe("stream.seconds", elapsed, tags)
+        if self.first_byte is not None:
+            metrics.observe("stream.first_byte_seconds", self.first_byte, tags)
+        if elapsed > 0:
+            metrics.observe("stream.throughput", self.bytes / elapsed, tags)
+        if not finished:
+            metrics.increment("stream.incomplete", 1, tags)
+
+
+class RecordFramer:
+    """
+    Incrementally splits an MBN byte stream into metadata and whole records.
+
+    Chunks are fed in as they arrive from the network; complete records can
+    then be taken off the front of the internal buffer while any trailing
+    partial record is kept until the rest of it arrives. The server's
+    end-of-stream status message is recognised at record boundaries only, so
+    payload bytes are never mistaken for it.
+    """
+
+    def __init__(self, meter: Optional[TransferMeter] = None):
+        self._buffer = bytearray()
+        self.metadata: Optional[bytes] = None
+        self.finished = False
+        self.meter = meter if meter is not None else TransferMeter()
+
+    def feed(self, chunk: bytes) -> None:
+        if self.finished or not chunk:
+            return
+
+        self._buffer.extend(chunk)
+        self.meter.responded()
+        self.meter.bytes += len(chunk)
+
+        if self.metadata is None:
+            self._read_metadata()
+
+    def take(self, max_records: Optional[int] = None) -> Tuple[bytes, int]:
+        """
+        Removes up to `max_records` complete records from the buffer.
+
+        Returns the raw record bytes and the number of records they contain.
+        """
+        if self.metadata is None:
+            return b"", 0
+
+        end, count = self._scan(max_records)
+        if end == 0:
+            return b"", 0
+
+        data = bytes(self._buffer[:end])
+        del self._buffer[:end]
+        self.meter.records += count
+        return data, count
+
+    @property
+    def buffered(self) -> int:
+        """Number of bytes received but not yet taken."""
+        return len(self._buffer)
+
+    @property
+    def progress(self) -> StreamProgress:
+        """
+        Records taken and bytes received so far, tracked as the stream is
+        framed so reporting never rescans the data.
+        """
+        return self.meter.progress(self.finished)
+
+    def _read_metadata(self) -> None:
+        if len(self._buffer) < METADATA_PREFIX_SIZE:
+            return
+
+        (length,) = struct.unpack_from("<H", self._buffer)
+        end = METADATA_PREFIX_SIZE + length
+
+        if len(self._buffer) < end:
+            return
+
+        self.metadata = bytes(self._buffer[:end])
+        del self._buffer[:end]
+
+    def _scan(self, max_records: Optional[int]) -> Tuple[int, int]:
+        buffer = self._buffer
+        size = len(buffer)
+
+        if size == 0:
+            return 0, 0
+
+        # Fast path: a single-schema stream has fixed-size records, so every
+        # length byte in the buffer can be checked with one strided slice.
+        length_byte = buffer[0]
+        record_size = length_byte * RECORD_LENGTH_MULTIPLIER
+
+        if (
+            record_size >= RECORD_HEADER_SIZE
+            and length_byte != END_OF_STREAM[0]
+        ):
+            count = size // record_size
+            if max_records is not None:
+                count = min(count, max_records)
+
+            end = count * record_size
+            if buffer[0:end:record_size] == bytes((length_byte,)) * count:
+                # Whatever follows is a partial record or the status message.
+                return self._scan_records(max_records, end, count)
+
+        return self._scan_records(max_records, 0, 0)
+
+    def _scan_records(
+        self,
+        max_records: Optional[int],
+        offset: int,
+        count: int,
+    ) -> Tuple[int, int]:
+        buffer = self._buffer
+        size = len(buffer)
+
+        while offset < size:
+            if max_records is not None and count >= max_records:
+                break
+
+            if self._at_end_of_stream(offset):
+                self.finished = True
+                del buffer[offset:]
+                break
+
+            record_size = buffer[offset] * RECORD_LENGTH_MULTIPLIER
+            if record_size < RECORD_HEADER_SIZE:
+                raise ValueError(
+                    f"Invalid record length {record_size} at offset {offset}"
+                )
+
+            if offset + record_size > size:
+                break
+
+            offset += record_size
+            count += 1
+
+        return offset, count
+
+    def _at_end_of_stream(self, offset: int) -> bool:
+        remaining = self._buffer[offset : offset + len(END_OF_STREAM)]
+
+        if len(remaining) < len(END_OF_STREAM):
+            # Could still turn out to be the status message; wait for more.
+            return False
+
+        return remaining == END_OF_STREAM
+
+
+class RecordCounter:
+    """
+    Counts the bytes and whole records of an MBN stream fed in chunks, by
+    walking the records' length bytes instead of buffering the data. A
+    record split across chunks is counted once its last byte is fed.
+    """
+
+    def __init__(self):
+        self.bytes = 0
+        self.records = 0
+        self._prefix = b""
+        # Bytes left of the metadata or of a record split across chunks
+        self._skip: Optional[int] = None
+        self._partial = False
+
+    def feed(self, chunk: bytes) -> None:
+        size = len(chunk)
+        self.bytes += size
+        offset = 0
+
+        if self._skip is None:
+            offset = METADATA_PREFIX_SIZE - len(self._prefix)
+            self._prefix += bytes(chunk[:offset])
+            if len(self._prefix) < METADATA_PREFIX_SIZE:
+                return
+            (self._skip,) = struct.unpack("<H", self._prefix)
+
+        if offset + self._skip > size:
+            self._skip -= size - offset
+            return
+
+        offset += self._skip
+        self._skip = 0
+        if self._partial:
+            self._partial = False
+            self.records += 1
+
+        # Fixed-size records are checked with one strided slice, as in
+        # RecordFramer._scan.
+        if offset < size:
+            length_byte = chunk[offset]
+            record_size = length_byte * RECORD_LENGTH_MULTIPLIER
+            if record_size >= RECORD_HEADER_SIZE:
+                count = (size - offset) // record_size
+                end = offset + count * record_size
+                if (
+                    chunk[offset:end:record_size]
+                    == bytes((length_byte,)) * count
+                ):
+                    offset = end
+                    self.records += count
+
+        while offset < size:
+            record_size = chunk[offset] * RECORD_LENGTH_MULTIPLIER
+            if record_size < RECORD_HEADER_SIZE:
+                raise ValueError(
+                    f"Invalid record length {record_size} at offset "
+                    f"{self.bytes - size + offset}"
+                )
+
+            if offset + record_size > size:
+                self._skip = offset + record_size - size
+                self._partial = True
+                return
+
+            offset += record_size
+            self.records += 1
+
+
+def split_mbn(data: bytes) -> Tuple[bytes, bytes]:
+    """Splits an encoded MBN buffer into its metadata and its records."""
+    (length,) = struct.unpack_from("<H", data)
+    end = METADATA_PREFIX_SIZE + length
+    return data[:end], data[end:]
+
+
+def merge_metadata(
+    metadata: List[bytes],
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+) -> bytes:
+    """
+    Combines the encoded metadata of several responses to the same schema
+    and dataset into one, spanning all of their symbols. The time range
+    covers every response unless `start`/`end` are given.
+    """
+    decoded = [Metadata.decode(m) for m in metadata]
+
+    mappings = {}
+    for m in decoded:
+        mappings.update(m.mappings.map)
+
+    merged = Metadata(
+        decoded[0].schema,
+        decoded[0].dataset,
+        min(m.start for m in decoded) if start is None else start,
+        max(m.end for m in decoded) if end is None else end,
+        SymbolMap(mappings),
+    )
+    return bytes(merged.encode())
+
+
+def merge_records(blocks: List[bytes]) -> bytes:
+    """
+    Merges blocks of time-ordered records into a single block ordered by
+    `ts_event`. Records with equal timestamps keep their block order.
+    """
+    blocks = [b for b in blocks if b]
+
+    if len(blocks) <= 1:
+        return blocks[0] if blocks else b""
+
+    data = b"".join(blocks)
+    record_size = data[0] * RECORD_LENGTH_MULTIPLIER
+
+    if len(data) % record_size != 0:
+        raise ValueError("Only records of a single schema can be merged.")
+
+    ts_event = np.frombuffer(data, dtype=_header_dtype(record_size))[
+        "ts_event"
+    ]
+    order = np.argsort(ts_event, kind="stable")
+    return np.frombuffer(data, dtype=f"V{record_size}")[order].tobytes()
+
+
+def slice_records(data: bytes, start: int, end: int) -> bytes:
+    """Returns the records in `data` with a `ts_event` in `[start, end)`."""
+    if not data:
+        return b""
+
+    record_size = data[0] * RECORD_LENGTH_MULTIPLIER
+    ts_event = np.frombuffer(data, dtype=_header_dtype(record_size))[
+        "ts_event"
+    ]
+    mask = (ts_event >= start) & (ts_event < end)
+
+    if mask.all():
+        return data
+    return np.frombuffer(data, dtype=f"V{record_size}")[mask].tobytes()
+
+
+def _header_dtype(record_size: int) -> np.dtype:
+    return np.dtype(
+        {
+            "names": ["ts_event"],
+            "formats": ["<u8"],
+            "offsets": [TS_EVENT_OFFSET],
+            "itemsize": record_size,
+        }
+    )
+
+
+def encode_chunks(
+    data: Iterable[Union[bytes, RecordMsg]],
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+    metadata: Optional[Metadata] = None,
+) -> Iterator[bytes]:
+    """
+    Lazily turns an iterable of MBN byte chunks and/or record objects into
+    binary chunks of `chunk_size` bytes (the last one may be shorter).
+
+    Record objects are encoded in batches of `ENCODE_BATCH_SIZE`, so only one
+    batch and one chunk are held in memory at a time.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be a positive integer.")
+
+    buffer = bytearray()
+    records = []
+
+    if metadata is not None:
+        buffer.extend(metadata.encode())
+
+    def encode_pending() -> None:
+        encoder = PyRecordEncoder()
+        encoder.encode_records(records)
+        buffer.extend(bytes(encoder.get_encoded_data()))
+        records.clear()
+
+    for item in data:
+        if isinstance(item, (bytes, bytearray, memoryview)):
+            if records:
+                encode_pending()
+            buffer.extend(item)
+        else:
+            records.append(item)
+            if len(records) >= ENCODE_BATCH_SIZE:
+                encode_pending()
+
+        while len(buffer) >= chunk_size:
+            yield bytes(buffer[:chunk_size])
+            del buffer[:chunk_size]
+
+    if records:
+        encode_pending()
+
+    for start in range(0, len(buffer), chunk_size):
+        yield bytes(buffer[start : start + chunk_size])
+
+
+def metered_chunks(
+    chunks: Iterable[bytes],
+    meter: TransferMeter,
+    on_progress: Optional[ProgressCallback] = None,
+) -> Iterator[bytes]:
+    """
+    Passes MBN upload chunks through while adding the bytes and records sent
+    to `meter`, calling `on_progress` after every chunk.
+    """
+    counter = RecordCounter()
+    for chunk in chunks:
+        counter.feed(chunk)
+        meter.bytes = counter.bytes
+        meter.records = counter.records
+
+        if on_progress is not None:
+            on_progress(meter.progress(False))
+
+        yield chunk
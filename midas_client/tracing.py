@@ -0,0 +1,350 @@
+import time
+import inspect
+import itertools
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # OpenTelemetry export is optional
+    otel_trace = None
+
+# Spans kept by the default in-memory exporter.
+RING_BUFFER_SIZE = 1024
+
+F = TypeVar("F", bound=Callable)
+
+_ids = itertools.count(1)
+_stack: contextvars.ContextVar[Tuple["Span", ...]] = contextvars.ContextVar(
+    "midas_span_stack", default=()
+)
+
+
+@dataclass
+class Span:
+    """
+    Timing of one client call.
+
+    Phases are in seconds and summed over the HTTP requests of the call:
+    - connect: DNS lookup and TCP connect of new connections.
+    - tls: TLS handshake of new connections.
+    - ttfb: From sending a request to its response headers, connecting
+      included.
+    - transfer: Reading response bodies.
+    - decode: Turning the bodies into JSON objects, records or arrays.
+
+    Attributes hold the HTTP method, path and status of the last request,
+    the number of requests and the sizes of the call: `request_bytes` and
+    `response_bytes` as sent over the wire when the bodies are not
+    streamed, `payload_bytes` and `records` of streamed bodies. Sizes are
+    summed over the requests, which may run on several threads.
+    """
+
+    name: str
+    span_id: int
+    parent_id: Optional[int] = None
+    start: float = field(default_factory=time.time)
+    duration: float = 0.0
+    phases: Dict[str, float] = field(default_factory=dict)
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def annotate(self, **attributes: Any) -> None:
+        with self._lock:
+            self.attributes.update(attributes)
+
+    def count(self, **values: int) -> None:
+        """Adds `values` to the attributes of the same name."""
+        with self._lock:
+            for name, value in values.items():
+                self.attributes[name] = self.attributes.get(name, 0) + value
+
+
+class SpanExporter:
+    """Receives every finished span; the base exporter discards them."""
+
+    def export(self, span: Span) -> None:
+        pass
+
+
+class RingBufferExporter(SpanExporter):
+    """Keeps the last `capacity` spans in memory."""
+
+    def __init__(self, capacity: int = RING_BUFFER_SIZE):
+        self._spans: deque = deque(maxlen=capacity)
+
+    def export(self, span: Span) -> None:
+        self._spans.append(span)
+
+    @property
+    def spans(self) -> List[Span]:
+        return list(self._spans)
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+
+class OpenTelemetryExporter(SpanExporter):
+    """
+    Re-emits spans through an OpenTelemetry tracer, with phases as
+    `midas.phase.<name>` attributes. Requires the `tracing` extra.
+    """
+
+    def __init__(self, tracer=None):
+        _opentelemetry()
+        self.tracer = tracer or otel_trace.get_tracer("midas_client")
+
+    def export(self, span: Span) -> None:
+        attributes = dict(span.attributes)
+        attributes.update(
+            {f"midas.phase.{k}": v for k, v in span.phases.items()}
+        )
+
+        start = int(span.start * 1e9)
+        otel_span = self.tracer.start_span(
+            span.name, start_time=start, attributes=attributes
+        )
+        if span.error is not None:
+            otel_span.set_status(
+                otel_trace.Status(otel_trace.StatusCode.ERROR, span.error)
+            )
+        otel_span.end(end_time=start + int(span.duration * 1e9))
+
+
+class Tracer:
+    """
+    Creates spans around client calls and hands them to `exporter` once
+    finished. Spans are tracked per context, see `propagate` to carry them
+    into pool threads.
+    """
+
+    def __init__(self, exporter: Optional[SpanExporter] = None):
+        self.exporter = (
+            exporter if exporter is not None else RingBufferExporter()
+        )
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[Span]:
+        span = self.begin(name)
+        try:
+            with activate(span):
+                yield span
+        except BaseException as e:
+            span.error = repr(e)
+            raise
+        finally:
+            self.end(span)
+
+    def begin(self, name: str) -> Span:
+        parent = current_span()
+        return Span(
+            name,
+            next(_ids),
+            parent.span_id if parent is not None else None,
+        )
+
+    def end(self, span: Span) -> None:
+        span.duration = time.time() - span.start
+        self.exporter.export(span)
+
+
+def current_span() -> Optional[Span]:
+    """The span active in this context, if any."""
+    stack = _stack.get()
+    return stack[-1] if stack else None
+
+
+@contextmanager
+def activate(span: Span) -> Iterator[Span]:
+    token = _stack.set(_stack.get() + (span,))
+    try:
+        yield span
+    finally:
+        _stack.reset(token)
+
+
+def propagate(func: F) -> F:
+    """
+    Wraps `func` to run in the context it was wrapped in, so calls made on
+    pool threads are recorded in the span active when it was wrapped.
+    """
+    context = contextvars.copy_context()
+
+    @wraps(func)
+    def run(*args, **kwargs):
+        # A context can only be entered by one thread at a time.
+        return context.copy().run(func, *args, **kwargs)
+
+    return run
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Adds the time spent in the block to `name` of the active span."""
+    span = current_span()
+    if span is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        span.add_phase(name, time.perf_counter() - started)
+
+
+def annotate(**attributes: Any) -> None:
+    """Sets attributes on the active span, if any."""
+    span = current_span()
+    if span is not None:
+        span.annotate(**attributes)
+
+
+def count(**values: int) -> None:
+    """Adds to attributes of the active span, if any."""
+    span = current_span()
+    if span is not None:
+        span.count(**values)
+
+
+def timed_chunks(chunks: Iterator[bytes], name: str) -> Iterator[bytes]:
+    """Yields `chunks`, adding the time spent reading them to `name`."""
+    chunks = iter(chunks)
+    while True:
+        with phase(name):
+            chunk = next(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def traced(func: F) -> F:
+    """
+    Runs a client method in a span named after it, when the client's
+    session has a tracer. Generators are traced from their first to their
+    last record, with the span only active while they run.
+    """
+    name = func.__qualname__
+
+    if inspect.isgeneratorfunction(func):
+
+        @wraps(func)
+        def generator(self, *args, **kwargs):
+            tracer = getattr(self.session, "tracer", None)
+            if tracer is None:
+                return (yield from func(self, *args, **kwargs))
+
+            span = tracer.begin(name)
+            inner = func(self, *args, **kwargs)
+            try:
+                while True:
+                    with activate(span):
+                        try:
+                            item = next(inner)
+                        except StopIteration as stop:
+                            return stop.value
+                    yield item
+            except BaseException as e:
+                if not isinstance(e, GeneratorExit):
+                    span.error = repr(e)
+                raise
+            finally:
+                inner.close()
+                tracer.end(span)
+
+        return generator
+
+    @wraps(func)
+    def method(self, *args, **kwargs):
+        tracer = getattr(self.session, "tracer", None)
+        if tracer is None:
+            return func(self, *args, **kwargs)
+
+        with tracer.span(name):
+            return func(self, *args, **kwargs)
+
+    return method
+
+
+class TracingAdapter(HTTPAdapter):
+    """
+    Adapter whose connections add their connect and TLS handshake times to
+    the active span.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TracedHTTPConnectionPool,
+            "https": _TracedHTTPSConnectionPool,
+        }
+
+
+class _TracedHTTPConnection(HTTPConnection):
+    def _new_conn(self):
+        with phase("connect"):
+            return super()._new_conn()
+
+
+class _TracedHTTPSConnection(HTTPSConnection):
+    def _new_conn(self):
+        started = time.perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            self._connect_seconds = time.perf_counter() - started
+            span = current_span()
+            if span is not None:
+                span.add_phase("connect", self._connect_seconds)
+
+    def connect(self):
+        self._connect_seconds = 0.0
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            span = current_span()
+            if span is not None:
+                elapsed = time.perf_counter() - started
+                span.add_phase("tls", elapsed - self._connect_seconds)
+
+
+class _TracedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TracedHTTPConnection
+
+
+class _TracedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TracedHTTPSConnection
+
+
+def _opentelemetry():
+    if otel_trace is None:
+        raise ImportError(
+            "OpenTelemetry export requires the opentelemetry-api package, "
+            "install it with `pip install midas_client[tracing]`."
+        )
+    return otel_trace
@@ -1,102 +1,216 @@
 import requests
-from typing import Dict
+from typing import Dict, Iterator, Optional, Tuple
+from .compression import compress
+from .metrics import session_metrics
+from .session import HttpSession
+from .stream import ProgressCallback, TransferMeter
+from .status import iter_status
+from .tracing import phase, traced
 from .utils import load_url
 from mbn import BacktestData, LiveData, PyBacktestEncoder
 import json
 
+# Statuses returned by servers that only accept JSON backtest bodies.
+# Validation errors (400, 422) are the backtest's fault, not the format's.
+BINARY_UNSUPPORTED_STATUS = (404, 405, 415)
+
 
 class TradingClient:
-    def __init__(self, api_url: str = ""):
+    def __init__(
+        self,
+        api_url: str = "",
+        session: Optional[requests.Session] = None,
+    ):
         if not api_url:
             api_url = load_url("TRADING_URL")
 
         self.api_url = f"{api_url}/trading"
+        self.session = session if session is not None else HttpSession()
+        self._binary_backtests = True
 
     # self.api_key = api_key
 
+    @traced
     def create_live(self, data: LiveData):
         url = f"{self.api_url}/live/create"
 
-        response = requests.post(url, json=data.__dict__())
+        response = self.session.post(url, json=data.__dict__())
 
         if response.status_code != 200:
             raise ValueError(f"Create live failed: {response.text}")
-        return response.json()
+        with phase("decode"):
+            return response.json()
 
+    @traced
     def delete_live(self, id: int) -> Dict:
         url = f"{self.api_url}/live/delete"
 
-        response = requests.delete(url, json=id)
+        response = self.session.delete(url, json=id)
 
         if response.status_code != 200:
             raise ValueError(f"Deleting live failed: {response.text}")
-        return response.json()
+        with phase("decode"):
+            return response.json()
 
+    @traced
     def get_live(self, id: int) -> Dict:
         url = f"{self.api_url}/live/get?id={id}"
 
-        response = requests.get(url)  # json=id)
+        response = self.session.get(url)  # json=id)
 
         if response.status_code != 200:
             raise ValueError(
                 f"Live instance retrieval failed: {response.text}"
             )
-        return response.json()
+        with phase("decode"):
+            return response.json()
+
+    @traced
+    def create_backtest(
+        self,
+        data: BacktestData,
+        binary: bool = False,
+        compression: Optional[str] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ):
+        """
+        Creates a backtest.
+
+        Parameters:
+        - data (BacktestData): Backtest to store.
+        - binary (bool): Send the encoded backtest as a raw
+          `application/octet-stream` body instead of a JSON array of bytes.
+          Servers that reject binary bodies are sent JSON instead, and are
+          remembered so later calls go straight to JSON.
+        - compression (str): Optional `gzip` or `zstd` content encoding for
+          the binary body.
+        - on_progress (ProgressCallback): Called with a `StreamProgress` for
+          every status message the server sends back.
+        """
+        response, meter = self._post_backtest(data, binary, compression)
+        last_response = None
 
-    def create_backtest(self, data: BacktestData):
+        # Keep updating with the latest parsed response
+        for chunk_data in self._iter_status(response, meter, on_progress):
+            last_response = chunk_data
+
+        # Return the last response
+        return last_response
+
+    @traced
+    def stream_create_backtest(
+        self,
+        data: BacktestData,
+        binary: bool = False,
+        compression: Optional[str] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Iterator[Dict]:
+        """
+        Creates a backtest, yielding each status message the server streams
+        back while it is being stored. Parameters are those of
+        `create_backtest`.
+        """
+        response, meter = self._post_backtest(data, binary, compression)
+        yield from self._iter_status(response, meter, on_progress)
+
+    def _post_backtest(
+        self,
+        data: BacktestData,
+        binary: bool,
+        compression: Optional[str],
+    ) -> Tuple[requests.Response, TransferMeter]:
         url = f"{self.api_url}/backtest/create"
 
         encoder = PyBacktestEncoder()
         buffer = encoder.encode_backtest(data)
 
-        response = requests.post(url, json=buffer, stream=True)
+        meter = TransferMeter()
+        if binary and self._binary_backtests:
+            body = bytes(buffer)
+            meter.bytes = len(body)
+            headers = {"Content-Type": "application/octet-stream"}
 
-        if response.status_code != 200:
-            raise ValueError(f"Error while creating records : {response.text}")
+            if compression is not None:
+                body = compress(body, compression)
+                headers["Content-Encoding"] = compression
 
-        last_response = None
+            response = self.session.post(
+                url, data=body, headers=headers, stream=True
+            )
 
-        # Read the streamed content in chunks
-        for chunk in response.iter_content(chunk_size=None):
-            if chunk:
-                try:
-                    chunk_data = json.loads(chunk.decode("utf-8"))
-                    last_response = chunk_data  # Keep updating with the latest parsed response
-                except json.JSONDecodeError as e:
-                    print(f"Failed to parse chunk as JSON: {e}")
+            if response.status_code in BINARY_UNSUPPORTED_STATUS:
+                response.close()
+                self._binary_backtests = False
+                response = self._post_json(url, buffer, meter)
+        else:
+            response = self._post_json(url, buffer, meter)
 
-        # Return the last response
-        return last_response
+        if response.status_code != 200:
+            raise ValueError(f"Error while creating records : {response.text}")
 
+        return response, meter
+
+    def _iter_status(
+        self,
+        response: requests.Response,
+        meter: TransferMeter,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Iterator[Dict]:
+        return iter_status(
+            response,
+            meter,
+            session_metrics(self.session),
+            "backtest.upload",
+            on_progress,
+        )
+
+    def _post_json(
+        self, url: str, buffer, meter: TransferMeter
+    ) -> requests.Response:
+        body = json.dumps(buffer).encode("utf-8")
+        meter.bytes = len(body)
+        return self.session.post(
+            url,
+            data=body,
+            headers={"Content-Type": "application/json"},
+            stream=True,
+        )
+
+    @traced
     def delete_backtest(self, id: int) -> Dict:
         url = f"{self.api_url}/backtest/delete"
 
-        response = requests.delete(url, json=id)
+        response = self.session.delete(url, json=id)
 
         if response.status_code != 200:
             raise ValueError(
                 f"Instrument list retrieval failed: {response.text}"
             )
-        return response.json()
+        with phase("decode"):
+            return response.json()
 
+    @traced
     def get_backtest(self, id: int) -> Dict:
         url = f"{self.api_url}/backtest/get?id={id}"
 
-        response = requests.get(url)  # json=id)
+        response = self.session.get(url)  # json=id)
 
         if response.status_code != 200:
             raise ValueError(
                 f"Instrument list retrieval failed: {response.text}"
             )
-        return response.json()
+        with phase("decode"):
+            return response.json()
 
+    @traced
     def get_backtest_by_name(self, name: str) -> Dict:
         url = f"{self.api_url}/backtest/get?name={name}"
 
-        response = requests.get(url)  # json=id)
+        response = self.session.get(url)  # json=id)
 
         if response.status_code != 200:
             raise ValueError(
                 f"Instrument list retrieval failed: {response.text}"
             )
-        return response.json()
+        with phase("decode"):
+            return response.json()
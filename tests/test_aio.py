@@ -0,0 +1,138 @@
+import mbn
+import json
+import asyncio
+import unittest
+from midas_client.stream import END_OF_STREAM
+from tests.test_stream import create_msgs, encode_metadata, encode_records
+
+try:
+    from aiohttp import web, test_utils
+    from midas_client.aio import AsyncHistoricalClient, AsyncHttpSession
+except ImportError:  # The async client is optional
+    web = None
+
+
+# Helper methods
+def create_params() -> mbn.RetrieveParams:
+    return mbn.RetrieveParams(
+        ["AAPL"],
+        "2024-01-01 00:00:00",
+        "2024-01-02 00:00:00",
+        mbn.Schema.MBP1,
+        mbn.Dataset.EQUITIES,
+        mbn.Stype.RAW,
+    )
+
+
+async def write_chunks(request, body: bytes, size: int):
+    """Writes `body` as a chunked response of `size` byte chunks."""
+    response = web.StreamResponse()
+    response.enable_chunked_encoding()
+    await response.prepare(request)
+
+    for i in range(0, len(body), size):
+        await response.write(body[i : i + size])
+        await asyncio.sleep(0)
+
+    await response.write_eof()
+    return response
+
+
+MESSAGES = [
+    {"status": "success", "message": "Processing batch", "data": ""},
+    {"status": "success", "message": "Created", "data": "10"},
+]
+
+
+@unittest.skipIf(web is None, "aiohttp is not installed")
+class TestAsyncClient(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.stream = encode_metadata() + encode_records(10) + END_OF_STREAM
+        self.uploads = []
+
+        async def get_stream(request):
+            return await write_chunks(request, self.stream, 7)
+
+        async def create_stream(request):
+            self.uploads.append(await request.json())
+            body = "".join(json.dumps(m) for m in MESSAGES).encode()
+            return await write_chunks(request, body, 5)
+
+        app = web.Application()
+        app.router.add_get("/historical/mbp/get/stream", get_stream)
+        app.router.add_post("/historical/mbp/create/stream", create_stream)
+
+        self.server = test_utils.TestServer(app)
+        await self.server.start_server()
+
+        self.session = AsyncHttpSession()
+        self.historical = AsyncHistoricalClient(
+            str(self.server.make_url("")).rstrip("/"), self.session
+        )
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.server.close()
+
+    async def test_get_records(self):
+        # Test
+        store = await self.historical.get_records(create_params())
+
+        # Validate
+        records = store.decode_to_array()
+        self.assertEqual(len(records), 10)
+        self.assertEqual(records[0].ts_event, create_msgs(1)[0].ts_event)
+
+    async def test_stream_records(self):
+        # Test
+        batches = [
+            batch
+            async for batch in self.historical.stream_records(
+                create_params(), batch_size=4
+            )
+        ]
+
+        # Validate
+        self.assertEqual([len(b) for b in batches], [4, 4, 2])
+        self.assertEqual(
+            [r.sequence for b in batches for r in b],
+            [m.sequence for m in create_msgs(10)],
+        )
+
+    async def test_stream_records_truncated(self):
+        self.stream = encode_metadata() + encode_records(10)
+        batches = []
+
+        # Test
+        with self.assertRaises(ValueError):
+            async for batch in self.historical.stream_records(
+                create_params(), batch_size=4
+            ):
+                batches.append(batch)
+
+        # Validate
+        self.assertEqual([len(b) for b in batches], [4, 4])
+
+    async def test_stream_create_records(self):
+        # Test
+        messages = [
+            message
+            async for message in self.historical.stream_create_records(
+                [1, 2, 3]
+            )
+        ]
+
+        # Validate
+        self.assertEqual(messages, MESSAGES)
+        self.assertEqual(self.uploads, [[1, 2, 3]])
+
+    async def test_create_records(self):
+        # Test
+        response = await self.historical.create_records([1, 2, 3])
+
+        # Validate
+        self.assertEqual(response, MESSAGES[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
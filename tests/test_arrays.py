@@ -0,0 +1,131 @@
+import os
+import mbn
+import tempfile
+import unittest
+import numpy as np
+from midas_client.arrays import (
+    BBO_DTYPE,
+    OHLCV_DTYPE,
+    TRADE_DTYPE,
+    pretty_array,
+    read_array,
+    to_array,
+)
+from tests.test_stream import encode_metadata, encode_records
+
+
+# Helper methods
+def encode_schema_metadata(schema: mbn.Schema) -> bytes:
+    metadata = mbn.Metadata(
+        schema, mbn.Dataset.EQUITIES, 1, 2, mbn.SymbolMap({1: "AAPL"})
+    )
+    encoder = mbn.PyMetadataEncoder()
+    encoder.encode_metadata(metadata)
+    return bytes(encoder.get_encoded_data())
+
+
+def create_array(dtype: np.dtype, rtype: int, **fields) -> np.ndarray:
+    array = np.zeros(1, dtype=dtype)
+    array["length"] = dtype.itemsize // 4
+    array["rtype"] = rtype
+    array["instrument_id"] = 1
+    array["ts_event"] = 1704209103644092564
+    for name, value in fields.items():
+        array[name] = value
+    return array
+
+
+class TestArrays(unittest.TestCase):
+    def test_mbp1_layout(self):
+        data = encode_metadata() + encode_records(5)
+
+        # Test
+        array = to_array(data)
+
+        # Validate
+        records = mbn.BufferStore(data).decode_to_array()
+        self.assertEqual(len(array), 5)
+        for row, record in zip(array, records):
+            self.assertEqual(row["ts_event"], record.ts_event)
+            self.assertEqual(row["ts_recv"], record.ts_recv)
+            self.assertEqual(row["price"], record.price)
+            self.assertEqual(row["sequence"], record.sequence)
+            self.assertEqual(row["bid_ct"], record.levels[0].bid_ct)
+            self.assertEqual(row["action"], b"T")
+
+    def test_ohlcv_layout(self):
+        array = create_array(
+            OHLCV_DTYPE, 2, open=1, high=2, low=3, close=4, volume=5
+        )
+        data = encode_schema_metadata(mbn.Schema.OHLCV1_H) + array.tobytes()
+
+        # Test
+        record = mbn.BufferStore(data).decode_to_array()[0]
+
+        # Validate
+        self.assertEqual(
+            (record.open, record.high, record.low, record.close),
+            (1, 2, 3, 4),
+        )
+        self.assertEqual(record.volume, 5)
+        self.assertEqual(to_array(data)[0], array[0])
+
+    def test_trade_layout(self):
+        array = create_array(
+            TRADE_DTYPE, 3, price=10, size=2, action=b"T", sequence=7
+        )
+        data = encode_schema_metadata(mbn.Schema.TRADES) + array.tobytes()
+
+        # Test
+        record = mbn.BufferStore(data).decode_to_array()[0]
+
+        # Validate
+        self.assertEqual((record.price, record.size), (10, 2))
+        self.assertEqual(record.sequence, 7)
+
+    def test_bbo_layout(self):
+        array = create_array(
+            BBO_DTYPE, 5, price=10, sequence=7, bid_px=11, ask_ct=12
+        )
+        data = encode_schema_metadata(mbn.Schema.BBO1_S) + array.tobytes()
+
+        # Test
+        record = mbn.BufferStore(data).decode_to_array()[0]
+
+        # Validate
+        self.assertEqual((record.price, record.sequence), (10, 7))
+        self.assertEqual(record.levels[0].bid_px, 11)
+        self.assertEqual(record.levels[0].ask_ct, 12)
+
+    def test_pretty_array(self):
+        array = create_array(OHLCV_DTYPE, 2, close=1_500_000_000)
+
+        # Test
+        pretty = pretty_array(array)
+
+        # Validate
+        self.assertEqual(pretty["close"][0], 1.5)
+        self.assertEqual(
+            pretty["ts_event"][0],
+            np.datetime64(1704209103644092564, "ns"),
+        )
+        self.assertEqual(pretty["volume"].dtype, np.uint64)
+
+    def test_read_array(self):
+        data = encode_metadata() + encode_records(3)
+
+        with tempfile.TemporaryDirectory() as dir:
+            path = os.path.join(dir, "records.bin")
+            with open(path, "wb") as f:
+                f.write(data)
+
+            # Test
+            array = read_array(path)
+
+            # Validate
+            np.testing.assert_array_equal(array, to_array(data))
+            del array
+
+
+if __name__ == "__main__":
+    unittest.main()
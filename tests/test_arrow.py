@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+from midas_client.arrow import (
+    NANOS_PER_DAY,
+    pa,
+    to_record_batch,
+    write_parquet,
+)
+from midas_client.stream import merge_records
+from tests.test_stream import encode_metadata, encode_records
+
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+class TestArrow(unittest.TestCase):
+    def setUp(self):
+        self.metadata = encode_metadata(mappings={1: "AAPL", 2: "HE.n.0"})
+
+        # Two symbols, two records per day over three days
+        step = NANOS_PER_DAY // 2
+        self.records = merge_records(
+            [
+                encode_records(6, id=1, step=step),
+                encode_records(6, id=2, step=step),
+            ]
+        )
+
+    def test_to_record_batch(self):
+        # Test
+        batch = to_record_batch(self.metadata, self.records)
+
+        # Validate
+        self.assertEqual(batch.num_rows, 12)
+        self.assertEqual(batch.column("symbol")[0].as_py(), "AAPL")
+        self.assertEqual(batch.column("symbol")[1].as_py(), "HE.n.0")
+        self.assertEqual(batch.column("action")[0].as_py(), "T")
+        self.assertEqual(
+            batch.schema.field("ts_event").type,
+            pa.timestamp("ns", tz="UTC"),
+        )
+        self.assertNotIn("length", batch.schema.names)
+
+    def test_write_parquet(self):
+        half = len(self.records) // 2
+        batches = [
+            (self.metadata, self.records[:half]),
+            (self.metadata, self.records[half:]),
+        ]
+
+        with tempfile.TemporaryDirectory() as root:
+            # Test
+            paths = write_parquet(batches, root)
+
+            # Validate
+            import pyarrow.dataset as ds
+
+            table = ds.dataset(
+                root, format="parquet", partitioning="hive"
+            ).to_table()
+            self.assertEqual(table.num_rows, 12)
+            self.assertEqual(len(paths), len(set(paths)))
+            for path in paths:
+                relative = os.path.relpath(path, root).split(os.sep)
+                self.assertEqual(relative[0], "schema=mbp-1")
+                self.assertIn(relative[1], ("symbol=AAPL", "symbol=HE.n.0"))
+                self.assertTrue(relative[2].startswith("date=2024-01-0"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import json
+import unittest
+from unittest import mock
+from midas_client.trading import TradingClient
+from tests.test_policy import create_session
+
+CREATED = {"status": "success", "message": "Created", "data": "1"}
+
+
+class TestBinaryBacktest(unittest.TestCase):
+    def setUp(self):
+        # The encoded backtest only needs to be a list of bytes here.
+        patcher = mock.patch("midas_client.trading.PyBacktestEncoder")
+        patcher.start().return_value.encode_backtest.return_value = [1, 2, 3]
+        self.addCleanup(patcher.stop)
+        self.content_types = []
+
+    def create_client(self, statuses: list) -> TradingClient:
+        def respond(status):
+            def outcome(request):
+                self.content_types.append(request.headers["Content-Type"])
+                return (
+                    json.dumps(CREATED).encode() if status == 200 else status
+                )
+
+            return outcome
+
+        session = create_session([respond(status) for status in statuses])
+        return TradingClient("http://test", session)
+
+    def test_fallback_to_json(self):
+        client = self.create_client([415, 200, 200])
+
+        # Test
+        first = client.create_backtest(None, binary=True)
+        second = client.create_backtest(None, binary=True)
+
+        # Validate
+        self.assertEqual(first, CREATED)
+        self.assertEqual(second, CREATED)
+        self.assertEqual(
+            self.content_types,
+            [
+                "application/octet-stream",
+                "application/json",
+                "application/json",
+            ],
+        )
+        self.assertFalse(client._binary_backtests)
+
+    def test_validation_error_not_resent(self):
+        client = self.create_client([400])
+
+        # Test
+        with self.assertRaises(ValueError):
+            client.create_backtest(None, binary=True)
+
+        # Validate
+        self.assertEqual(self.content_types, ["application/octet-stream"])
+        self.assertTrue(client._binary_backtests)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,392 @@
+import os
+import json
+import time
+import tempfile
+import unittest
+from midas_client.cache import InstrumentCache, RecordCache, missing_ranges
+from midas_client.historical import HistoricalClient
+from midas_client.instrument import InstrumentClient
+from midas_client.stream import merge_records, slice_records, split_mbn
+from tests.test_policy import create_session
+from tests.test_stream import (
+    create_msgs,
+    encode_metadata,
+    encode_records,
+    serve_records,
+)
+
+MINUTE = 60_000_000_000
+
+# Start of the minute holding the first test record, which is the i-th
+# record's minute offset from here.
+W0 = create_msgs(1)[0].ts_event - create_msgs(1)[0].ts_event % MINUTE
+
+
+# Helper methods
+def payload(symbol: str, start: int = 1, end: int = 2) -> dict:
+    return {
+        "symbols": [symbol],
+        "start_ts": start,
+        "end_ts": end,
+        "schema": "Mbp1",
+        "dataset": "Equities",
+        "stype": "Raw",
+    }
+
+
+def window(start: int, end: int) -> tuple:
+    """Bounds of minutes `start` to `end` of the test records."""
+    return W0 + start * MINUTE, W0 + end * MINUTE
+
+
+class TestRecordCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_put_get(self):
+        cache = RecordCache(self.dir.name)
+
+        # Test
+        cache.put(payload("AAPL"), b"data")
+        path = cache.get(payload("AAPL"))
+
+        # Validate
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"data")
+        self.assertIsNone(cache.get(payload("AAPL", end=3)))
+
+    def test_index_persisted(self):
+        RecordCache(self.dir.name).put(payload("AAPL"), b"data")
+
+        # Test
+        path = RecordCache(self.dir.name).get(payload("AAPL"))
+
+        # Validate
+        self.assertTrue(os.path.exists(path))
+
+    def test_lru_eviction(self):
+        cache = RecordCache(self.dir.name, max_bytes=10)
+        cache.put(payload("AAPL"), b"1234")
+        time.sleep(0.01)
+        cache.put(payload("TSLA"), b"1234")
+        time.sleep(0.01)
+        cache.get(payload("AAPL"))
+
+        # Test
+        cache.put(payload("MSFT"), b"1234")
+
+        # Validate
+        self.assertIsNotNone(cache.get(payload("AAPL")))
+        self.assertIsNone(cache.get(payload("TSLA")))
+        self.assertIsNotNone(cache.get(payload("MSFT")))
+        self.assertEqual(cache.size, 8)
+
+    def test_shared_directory(self):
+        # Caches of separate processes, each with its own copy of the index
+        first = RecordCache(self.dir.name, max_bytes=10)
+        second = RecordCache(self.dir.name, max_bytes=10)
+
+        # Test
+        first.put(payload("AAPL"), b"1234")
+        time.sleep(0.01)
+        second.put(payload("TSLA"), b"1234")
+        time.sleep(0.01)
+        first.put(payload("MSFT"), b"1234")
+
+        # Validate
+        cache = RecordCache(self.dir.name)
+        self.assertIsNone(cache.get(payload("AAPL")))
+        self.assertIsNotNone(cache.get(payload("TSLA")))
+        self.assertIsNotNone(cache.get(payload("MSFT")))
+        files = [f for f in os.listdir(self.dir.name) if f.endswith(".bin")]
+        self.assertEqual(len(files), 2)
+        self.assertEqual(first.size, 8)
+
+    def test_hits_batched(self):
+        cache = RecordCache(self.dir.name, save_interval=60)
+        cache.put(payload("AAPL"), b"data")
+        index_path = os.path.join(self.dir.name, RecordCache.INDEX_FILE)
+        with open(index_path) as f:
+            saved = json.load(f)
+
+        # Test
+        time.sleep(0.01)
+        cache.get(payload("AAPL"))
+
+        # Validate
+        with open(index_path) as f:
+            self.assertEqual(json.load(f), saved)
+        cache.flush()
+        with open(index_path) as f:
+            (entry,) = json.load(f).values()
+        (before,) = saved.values()
+        self.assertGreater(entry["accessed"], before["accessed"])
+
+    def test_segments(self):
+        cache = RecordCache(self.dir.name)
+        cache.put(payload("AAPL", 0, 10), b"a")
+        cache.put(payload("AAPL", 20, 30), b"b")
+        cache.put(payload("TSLA", 0, 30), b"c")
+
+        # Test
+        segments = cache.segments(payload("AAPL", 5, 25))
+
+        # Validate
+        self.assertEqual([(s, e) for s, e, _ in segments], [(0, 10), (20, 30)])
+
+
+class TestCachedRanges(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.cache = RecordCache(self.dir.name)
+        self.symbols = {
+            "AAPL": (1, encode_records(10, id=1, step=MINUTE)),
+            "TSLA": (2, encode_records(10, id=2, step=MINUTE)),
+        }
+        self.requested = []
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def create_client(self, requests: int) -> HistoricalClient:
+        respond = serve_records(self.symbols)
+
+        def record(request):
+            self.requested.append(json.loads(request.body))
+            return respond(request)
+
+        session = create_session([record] * requests)
+        return HistoricalClient("http://test", session, cache=self.cache)
+
+    def put(self, symbol: str, start: int, end: int):
+        id, records = self.symbols[symbol]
+        self.cache.put(
+            payload(symbol, start, end),
+            encode_metadata(start, end, {id: symbol})
+            + slice_records(records, start, end),
+        )
+
+    def expected(self, start: int, end: int) -> bytes:
+        return merge_records(
+            [slice_records(r, start, end) for _, r in self.symbols.values()]
+        )
+
+    def test_fetches_only_gaps(self):
+        self.put("AAPL", *window(2, 5))
+        client = self.create_client(3)
+        start, end = window(0, 8)
+
+        # Test
+        data = client._get_cached_ranges(
+            dict(payload("AAPL", start, end), symbols=["AAPL", "TSLA"])
+        )
+
+        # Validate
+        self.assertEqual(
+            [
+                (p["symbols"], p["start_ts"], p["end_ts"])
+                for p in self.requested
+            ],
+            [
+                (["AAPL"], *window(0, 2)),
+                (["AAPL"], *window(5, 8)),
+                (["TSLA"], start, end),
+            ],
+        )
+        _, records = split_mbn(data)
+        self.assertEqual(records, self.expected(start, end))
+
+    def test_overlapping_ranges_sliced(self):
+        self.put("AAPL", *window(0, 6))
+        self.put("AAPL", *window(4, 10))
+        client = self.create_client(0)
+        start, end = window(1, 9)
+
+        # Test
+        data = client._get_cached_ranges(payload("AAPL", start, end))
+
+        # Validate
+        _, records = split_mbn(data)
+        _, aapl = self.symbols["AAPL"]
+        self.assertEqual(records, slice_records(aapl, start, end))
+        self.assertEqual(len(records), len(aapl) * 8 // 10)
+
+    def test_widened_to_interval(self):
+        client = self.create_client(1)
+        start, end = window(1, 4)
+
+        # Test
+        client._get_cached_ranges(
+            dict(
+                payload("AAPL", start + 1, end - 1),
+                schema="Ohlcv1M",
+            )
+        )
+
+        # Validate
+        self.assertEqual(
+            [(p["start_ts"], p["end_ts"]) for p in self.requested],
+            [(start, end)],
+        )
+        widened = dict(payload("AAPL", start, end), schema="Ohlcv1M")
+        self.assertIsNotNone(self.cache.get(widened))
+
+    def test_pieces_coalesced(self):
+        self.put("AAPL", *window(2, 5))
+        start, end = window(0, 8)
+        self.create_client(2)._get_cached_ranges(payload("AAPL", start, end))
+
+        # Test
+        data = self.create_client(0)._get_cached_ranges(
+            payload("AAPL", start, end)
+        )
+
+        # Validate
+        segments = self.cache.segments(payload("AAPL", start, end))
+        self.assertEqual([(s, e) for s, e, _ in segments], [(start, end)])
+        self.assertIsNone(self.cache.get(payload("AAPL", *window(2, 5))))
+        _, records = split_mbn(data)
+        self.assertEqual(
+            records, slice_records(self.symbols["AAPL"][1], start, end)
+        )
+
+
+class TestInstrumentCache(unittest.TestCase):
+    def test_put_get(self):
+        cache = InstrumentCache()
+        key = InstrumentCache.key("get", "Equities", ticker="AAPL")
+
+        # Test
+        cache.put(key, {"code": 200, "data": []})
+
+        # Validate
+        self.assertEqual(cache.get(key), {"code": 200, "data": []})
+        self.assertEqual(
+            key, InstrumentCache.key("get", "equities", ticker="AAPL")
+        )
+
+    def test_ticker_case_kept(self):
+        # Validate
+        self.assertNotEqual(
+            InstrumentCache.key("get", "Equities", ticker="BRK.a"),
+            InstrumentCache.key("get", "Equities", ticker="BRK.A"),
+        )
+
+    def test_expiry(self):
+        cache = InstrumentCache(ttl=0.05)
+        cache.put("key", 1)
+
+        # Test
+        time.sleep(0.1)
+
+        # Validate
+        self.assertIsNone(cache.get("key"))
+
+    def test_invalidate(self):
+        cache = InstrumentCache()
+        cache.put("a", 1)
+        cache.put("b", 2)
+
+        # Test
+        cache.invalidate("a")
+
+        # Validate
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), 2)
+
+        cache.invalidate()
+        self.assertIsNone(cache.get("b"))
+
+    def test_file_backed(self):
+        with tempfile.TemporaryDirectory() as dir:
+            path = os.path.join(dir, "instruments.json")
+            previous = InstrumentCache(path=path)
+            previous.put("key", {"data": [1]})
+            previous.flush()
+
+            # Test
+            cache = InstrumentCache(path=path)
+
+            # Validate
+            self.assertEqual(cache.get("key"), {"data": [1]})
+
+    def test_saves_batched(self):
+        with tempfile.TemporaryDirectory() as dir:
+            path = os.path.join(dir, "instruments.json")
+            cache = InstrumentCache(path=path, save_interval=60)
+
+            # Test
+            for i in range(100):
+                cache.put(f"key{i}", i)
+
+            # Validate
+            self.assertFalse(os.path.exists(path))
+            cache.flush()
+            self.assertEqual(InstrumentCache(path=path).get("key99"), 99)
+
+    def test_instrument_maps(self):
+        body = {
+            "code": 200,
+            "data": [
+                {"ticker": "AAPL", "instrument_id": 1},
+                {"ticker": "TSLA", "instrument_id": 2},
+            ],
+        }
+        session = create_session([json.dumps(body).encode()])
+        client = InstrumentClient("http://test", session)
+
+        # Test
+        ticker_to_id, id_to_ticker = client.instrument_maps("Equities")
+
+        # Validate
+        self.assertEqual(ticker_to_id, {"AAPL": 1, "TSLA": 2})
+        self.assertEqual(id_to_ticker, {1: "AAPL", 2: "TSLA"})
+        self.assertEqual(len(session.get_adapter("http://test").requests), 1)
+
+
+class TestBulkLookup(unittest.TestCase):
+    def test_fallback_unsupported(self):
+        body = {"code": 200, "data": [{"ticker": "AAPL", "instrument_id": 1}]}
+        session = create_session([404, json.dumps(body).encode()])
+        client = InstrumentClient("http://test", session)
+
+        # Test
+        found = client.get_instruments(["AAPL", "TSLA"], "Equities")
+
+        # Validate
+        adapter = session.get_adapter("http://test")
+        self.assertEqual(found, {"AAPL": body["data"][0]})
+        self.assertEqual(len(adapter.requests), 2)
+        self.assertFalse(client._bulk_lookup)
+
+    def test_validation_error_raises(self):
+        session = create_session([422])
+        client = InstrumentClient("http://test", session)
+
+        # Validate
+        with self.assertRaises(ValueError):
+            client.get_instruments(["AAPL"], "Equities")
+        self.assertTrue(client._bulk_lookup)
+
+
+class TestMissingRanges(unittest.TestCase):
+    def test_missing_ranges(self):
+        # Test
+        gaps = missing_ranges([(0, 10), (20, 30), (25, 40)], 5, 50)
+
+        # Validate
+        self.assertEqual(gaps, [(10, 20), (40, 50)])
+
+    def test_fully_covered(self):
+        # Test
+        gaps = missing_ranges([(0, 10), (10, 20)], 0, 20)
+
+        # Validate
+        self.assertEqual(gaps, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+import os
+import mbn
+import tempfile
+import unittest
+from midas_client.checkpoint import Checkpoint
+from midas_client.historical import HistoricalClient
+from midas_client.stream import merge_records, split_mbn
+from tests.test_policy import create_session
+from tests.test_stream import encode_metadata, encode_records, serve_records
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        # Two instruments interleaved on ts_event, two records per timestamp
+        self.records = merge_records(
+            [encode_records(3, id=1), encode_records(3, id=2)]
+        )
+        self.record_size = self.records[0] * 4
+
+    def test_advance(self):
+        checkpoint = Checkpoint("key")
+        first = self.records[: self.record_size * 3]
+
+        # Test
+        written = checkpoint.advance(first)
+
+        # Validate
+        self.assertEqual(written, first)
+        self.assertEqual(checkpoint.offset, len(first))
+        self.assertEqual(len(checkpoint.boundary), 1)
+
+    def test_advance_drops_boundary_duplicates(self):
+        checkpoint = Checkpoint("key")
+        checkpoint.advance(self.records[: self.record_size * 3])
+
+        # Test
+        checkpoint.resume()
+        resent = self.records[self.record_size * 2 :]
+        written = checkpoint.advance(resent)
+
+        # Validate
+        self.assertEqual(written, self.records[self.record_size * 3 :])
+        self.assertEqual(checkpoint.offset, len(self.records))
+
+    def test_advance_keeps_identical_records(self):
+        checkpoint = Checkpoint("key")
+        record = self.records[: self.record_size]
+        checkpoint.advance(record)
+
+        # Test
+        written = checkpoint.advance(record + record)
+
+        # Validate
+        self.assertEqual(written, record + record)
+        self.assertEqual(checkpoint.offset, self.record_size * 3)
+
+    def test_advance_drops_duplicates_across_blocks(self):
+        checkpoint = Checkpoint("key")
+        record = self.records[: self.record_size]
+        checkpoint.advance(record + record)
+
+        # Test
+        checkpoint.resume()
+        first = checkpoint.advance(record)
+        second = checkpoint.advance(record + record)
+
+        # Validate
+        self.assertEqual(first, b"")
+        self.assertEqual(second, record)
+        self.assertEqual(checkpoint.offset, self.record_size * 3)
+
+    def test_save_load(self):
+        checkpoint = Checkpoint("key")
+        checkpoint.advance(self.records)
+
+        with tempfile.TemporaryDirectory() as dir:
+            path = os.path.join(dir, "records.bin.ckpt")
+
+            # Test
+            checkpoint.save(path)
+
+            # Validate
+            self.assertEqual(Checkpoint.load(path, "key"), checkpoint)
+            self.assertIsNone(Checkpoint.load(path, "other"))
+
+
+class TestResumableDownload(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "records.bin")
+        self.symbols = {
+            "AAPL": (1, encode_records(3, id=1)),
+            "TSLA": (2, encode_records(3, id=2)),
+        }
+        # Two instruments interleaved on ts_event, two records per timestamp
+        self.records = merge_records([r for _, r in self.symbols.values()])
+        self.record_size = self.records[0] * 4
+        self.params = mbn.RetrieveParams(
+            ["AAPL", "TSLA"],
+            "2024-01-02 00:00:00",
+            "2024-01-03 00:00:00",
+            mbn.Schema.MBP1,
+            mbn.Dataset.EQUITIES,
+            mbn.Stype.RAW,
+        )
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_completes_without_checkpoint(self):
+        client = HistoricalClient(
+            "http://test", create_session([serve_records(self.symbols)])
+        )
+
+        # Test
+        path = client.get_records_to_file(self.params, self.path, resume=True)
+
+        # Validate
+        with open(path, "rb") as f:
+            _, records = split_mbn(f.read())
+        self.assertEqual(records, self.records)
+        self.assertEqual(os.listdir(self.dir.name), ["records.bin"])
+
+    def test_resumes_after_interruption(self):
+        # Cut off between the two records of the second timestamp
+        interrupted = (
+            encode_metadata(mappings={1: "AAPL", 2: "TSLA"})
+            + self.records[: self.record_size * 3]
+        )
+        client = HistoricalClient(
+            "http://test",
+            create_session([interrupted, serve_records(self.symbols)]),
+        )
+
+        # Test
+        path = client.get_records_to_file(self.params, self.path, resume=True)
+
+        # Validate
+        adapter = client.session.get_adapter("http://test")
+        self.assertEqual(len(adapter.requests), 2)
+        with open(path, "rb") as f:
+            _, records = split_mbn(f.read())
+        self.assertEqual(records, self.records)
+        self.assertEqual(os.listdir(self.dir.name), ["records.bin"])
+
+
+if __name__ == "__main__":
+    unittest.main()
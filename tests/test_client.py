@@ -0,0 +1,40 @@
+import os
+import unittest
+from midas_client import DatabaseClient
+
+
+class TestDatabaseClient(unittest.TestCase):
+    def setUp(self):
+        for var in ("HISTORICAL_URL", "TRADING_URL", "INSTRUMENT_URL"):
+            os.environ.setdefault(var, "http://127.0.0.1:8080")
+
+    def test_lazy_sub_clients(self):
+        # Test
+        client = DatabaseClient()
+
+        # Validate
+        self.assertNotIn("session", client.__dict__)
+        self.assertNotIn("historical", client.__dict__)
+        client.close()
+
+    def test_shared_session(self):
+        client = DatabaseClient()
+
+        # Test
+        instrument = client.instrument
+        historical = client.historical
+
+        # Validate
+        self.assertIs(instrument, client.instrument)
+        self.assertIs(instrument.session, historical.session)
+        self.assertNotIn("trading", client.__dict__)
+        client.close()
+
+    def test_invalid_compression(self):
+        # Validate
+        with self.assertRaises(ValueError):
+            DatabaseClient(compression="brotli")
+
+
+if __name__ == "__main__":
+    unittest.main()
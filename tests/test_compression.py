@@ -0,0 +1,97 @@
+import io
+import gzip
+import socket
+import unittest
+import requests
+from urllib3 import HTTPResponse
+from midas_client.compression import (
+    check_encoding,
+    compress_chunks,
+    iter_decoded,
+)
+
+
+# Helper methods
+class DroppedBody(io.BytesIO):
+    """Body whose connection fails with `error` once its data is read."""
+
+    def __init__(self, data: bytes, error: Exception):
+        super().__init__(data)
+        self.error = error
+
+    def read(self, *args):
+        data = super().read(*args)
+        if not data:
+            raise self.error
+        return data
+
+
+def create_response(body: io.BytesIO) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.headers["Content-Encoding"] = "gzip"
+    response.raw = HTTPResponse(
+        body, headers=dict(response.headers), preload_content=False
+    )
+    return response
+
+
+class TestCompression(unittest.TestCase):
+    def test_compress_chunks_gzip(self):
+        chunks = [bytes([i]) * 1000 for i in range(10)]
+
+        # Test
+        compressed = b"".join(compress_chunks(iter(chunks), "gzip"))
+
+        # Validate
+        self.assertEqual(gzip.decompress(compressed), b"".join(chunks))
+        self.assertLess(len(compressed), 1000)
+
+    def test_check_encoding(self):
+        # Test
+        encoding = check_encoding("gzip")
+
+        # Validate
+        self.assertEqual(encoding, "gzip")
+        self.assertIsNone(check_encoding(None))
+        with self.assertRaises(ValueError):
+            check_encoding("br")
+
+    def test_iter_decoded_gzip(self):
+        data = bytes(range(256)) * 1000
+        response = create_response(io.BytesIO(gzip.compress(data)))
+
+        # Test
+        decoded = b"".join(iter_decoded(response))
+
+        # Validate
+        self.assertEqual(decoded, data)
+
+    def test_iter_decoded_connection_dropped(self):
+        body = gzip.compress(b"data" * 1000)
+        response = create_response(
+            DroppedBody(body[:100], ConnectionResetError("reset"))
+        )
+
+        # Validate
+        with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+            b"".join(iter_decoded(response))
+
+    def test_iter_decoded_read_timeout(self):
+        body = gzip.compress(b"data" * 1000)
+        response = create_response(DroppedBody(body[:100], socket.timeout()))
+
+        # Validate
+        with self.assertRaises(requests.ConnectionError):
+            b"".join(iter_decoded(response))
+
+    def test_iter_decoded_corrupt(self):
+        response = create_response(io.BytesIO(b"not gzip data"))
+
+        # Validate
+        with self.assertRaises(requests.exceptions.ContentDecodingError):
+            b"".join(iter_decoded(response))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -180,6 +180,33 @@ class TestClientMethods(unittest.TestCase):
         # Cleanup
         delete_instruments(id)
 
+    def test_get_records_to_file(self):
+        file_path = "tests/data/mbp-1-stream.bin"
+        id = create_instruments("AAPL", "Apple Inc.")
+
+        # Create Records
+        create_records(id, self.client)
+
+        params = RetrieveParams(
+            ["AAPL"],
+            "2023-11-01",
+            "2024-11-30",
+            mbn.Schema.MBP1,
+            mbn.Dataset.EQUITIES,
+            mbn.Stype.RAW,
+        )
+
+        # Test
+        path = self.client.historical.get_records_to_file(params, file_path)
+
+        # Validate
+        data = BufferStore.from_file(path)
+        self.assertEqual(path, file_path)
+        self.assertTrue(len(data.decode_to_array()) > 0)
+
+        # Cleanup
+        delete_instruments(id)
+
     def test_read_ohlcv_file(self):
         file_path = "tests/data/ohlcv.bin"
         id = create_instruments("AAPL", "Apple Inc.")
@@ -0,0 +1,108 @@
+import os
+import json
+import tempfile
+import unittest
+import numpy as np
+from midas_client.arrays import MBP1_DTYPE, to_array
+from midas_client.ingest import (
+    encode_json_file,
+    iter_batches,
+    iter_encoded,
+    upload_ordered,
+)
+from tests.test_stream import encode_metadata, encode_records
+
+LEVEL_FIELDS = ("bid_px", "ask_px", "bid_sz", "ask_sz", "bid_ct", "ask_ct")
+
+
+def to_dicts(array: np.ndarray) -> list:
+    records = []
+    for row in array:
+        record = {}
+        for name in array.dtype.names:
+            value = row[name]
+            record[name] = (
+                value.decode() if isinstance(value, bytes) else value.item()
+            )
+        record["levels"] = [{n: record.pop(n) for n in LEVEL_FIELDS}]
+        records.append(record)
+    return records
+
+
+class TestIngest(unittest.TestCase):
+    def setUp(self):
+        self.array = to_array(encode_metadata() + encode_records(10))
+
+    def test_encode_json_file(self):
+        with tempfile.TemporaryDirectory() as dir:
+            path = os.path.join(dir, "records.json")
+            with open(path, "w") as f:
+                json.dump(to_dicts(self.array), f)
+
+            # Test
+            encoded = np.frombuffer(encode_json_file(path), dtype=MBP1_DTYPE)
+
+        # Validate
+        for name in MBP1_DTYPE.names:
+            np.testing.assert_array_equal(encoded[name], self.array[name])
+
+    def test_iter_encoded_order(self):
+        with tempfile.TemporaryDirectory() as dir:
+            path = os.path.join(dir, "records.json")
+            with open(path, "w") as f:
+                json.dump(to_dicts(self.array[5:]), f)
+
+            # Test
+            arrays = list(iter_encoded([self.array[:5], path], workers=1))
+
+        # Validate
+        self.assertEqual([len(a) for a in arrays], [5, 5])
+        np.testing.assert_array_equal(
+            arrays[1]["ts_event"], self.array[5:]["ts_event"]
+        )
+
+    def test_iter_batches(self):
+        # Test
+        batches = list(iter_batches([self.array[:3], self.array[3:]], 4))
+
+        # Validate
+        sizes = [len(b) // MBP1_DTYPE.itemsize for b in batches]
+        self.assertEqual(sizes, [4, 4, 2])
+        self.assertEqual(b"".join(batches), self.array.tobytes())
+
+    def test_upload_ordered(self):
+        batches = [bytes(MBP1_DTYPE.itemsize * n) for n in (3, 2, 1, 4)]
+        acked = []
+
+        def upload(batch):
+            return {"status": "success", "records": len(batch)}
+
+        # Test
+        acks = upload_ordered(batches, upload, 3, on_ack=acked.append)
+
+        # Validate
+        self.assertEqual([a.index for a in acks], [0, 1, 2, 3])
+        self.assertEqual([a.records for a in acks], [3, 2, 1, 4])
+        self.assertEqual(acked, acks)
+
+    def test_upload_ordered_failure(self):
+        batches = [bytes(MBP1_DTYPE.itemsize)] * 10
+        uploaded = []
+
+        def upload(batch):
+            uploaded.append(batch)
+            if len(uploaded) == 2:
+                raise ValueError("Error with request")
+            return {"status": "success"}
+
+        acked = []
+
+        # Validate
+        with self.assertRaises(ValueError):
+            upload_ordered(batches, upload, 1, on_ack=acked.append)
+        self.assertEqual([a.index for a in acked], [0])
+        self.assertEqual(len(uploaded), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
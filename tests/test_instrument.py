@@ -63,6 +63,24 @@ class TestClientMethods(unittest.TestCase):
         # Cleanup
         delete_instruments(id)
 
+    def test_get_instruments(self):
+        tickers = ["APELR", "APELS"]
+        ids = [create_instruments(ticker, "testing") for ticker in tickers]
+
+        # Test
+        response = self.client.instrument.get_instruments(
+            tickers + ["MISSING"],
+            "Equities",
+        )
+
+        # Validate
+        self.assertEqual(set(response), set(tickers))
+        self.assertEqual(response["APELR"]["ticker"], "APELR")
+
+        # Cleanup
+        for id in ids:
+            delete_instruments(id)
+
     def test_dataset_instrument(self):
         ticker = "APELR"
         name = "testing"
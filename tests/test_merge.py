@@ -0,0 +1,106 @@
+import os
+import mbn
+import tempfile
+import unittest
+import numpy as np
+from midas_client.arrays import to_array
+from midas_client.merge import iter_merged, merge_arrays
+from tests.test_stream import encode_metadata, encode_records
+
+
+class TestMergeArrays(unittest.TestCase):
+    def test_merge_order(self):
+        arrays = [
+            to_array(encode_metadata() + encode_records(50, id=1, step=3)),
+            to_array(encode_metadata() + encode_records(40, id=2, step=5)),
+            to_array(encode_metadata() + encode_records(7, id=3, step=1)),
+        ]
+
+        # Test
+        blocks = list(merge_arrays(arrays, block_size=8))
+
+        # Validate
+        merged = np.concatenate(blocks)
+        self.assertEqual(len(merged), 97)
+        self.assertTrue(np.all(np.diff(merged["ts_event"].astype(int)) >= 0))
+        for id, count in ((1, 50), (2, 40), (3, 7)):
+            self.assertEqual(np.sum(merged["instrument_id"] == id), count)
+
+    def test_duplicate_keys_across_blocks(self):
+        arrays = []
+        for id, ts_event in ((1, [1, 2, 2, 2, 2, 3]), (2, [2, 2, 2, 2])):
+            records = encode_records(len(ts_event), id=id)
+            array = to_array(encode_metadata() + records).copy()
+            array["ts_event"] = ts_event
+            arrays.append(array)
+
+        for block_size in (1, 2, 3, 4):
+            with self.subTest(block_size=block_size):
+                # Test
+                blocks = list(merge_arrays(arrays, block_size=block_size))
+
+                # Validate
+                merged = np.concatenate(blocks)
+                self.assertEqual(
+                    merged["ts_event"].tolist(), [1] + [2] * 8 + [3]
+                )
+                self.assertEqual(np.sum(merged["instrument_id"] == 2), 4)
+
+    def test_unsorted_source(self):
+        array = to_array(encode_metadata() + encode_records(5))[::-1]
+
+        # Validate
+        with self.assertRaises(ValueError):
+            list(merge_arrays([array]))
+
+    def test_missing_key(self):
+        array = to_array(encode_metadata() + encode_records(5))
+
+        # Validate
+        with self.assertRaises(ValueError):
+            list(merge_arrays([array], key="volume"))
+
+
+class TestIterMerged(unittest.TestCase):
+    def test_sources(self):
+        first = encode_metadata(mappings={1: "AAPL"}) + encode_records(
+            20, id=1, step=2
+        )
+        second = encode_metadata(mappings={2: "HE.n.0"}) + encode_records(
+            20, id=2, step=3
+        )
+        third = encode_metadata(mappings={3: "ZC.n.0"}) + encode_records(
+            5, id=3
+        )
+
+        with tempfile.TemporaryDirectory() as dir:
+            path = os.path.join(dir, "second.bin")
+            with open(path, "wb") as f:
+                f.write(second)
+
+            # Test
+            batches = iter_merged(
+                [first, path, mbn.BufferStore(third)], block_size=4
+            )
+            records = [r for batch in batches for r in batch]
+
+        # Validate
+        self.assertEqual(len(records), 45)
+        ts_event = [r.ts_event for r in records]
+        self.assertEqual(ts_event, sorted(ts_event))
+
+    def test_ts_recv(self):
+        data = encode_metadata() + encode_records(10, step=5)
+
+        # Test
+        batches = iter_merged([data, data], key="ts_recv")
+        records = [r for batch in batches for r in batch]
+
+        # Validate
+        ts_recv = [r.ts_recv for r in records]
+        self.assertEqual(len(records), 20)
+        self.assertEqual(ts_recv, sorted(ts_recv))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import requests
+from midas_client.metrics import InMemoryMetrics, session_metrics
+from midas_client.session import HttpSession
+from tests.test_policy import ScriptedAdapter
+
+
+class TestInMemoryMetrics(unittest.TestCase):
+    def test_counter_tags(self):
+        metrics = InMemoryMetrics()
+
+        # Test
+        metrics.increment("http.requests", tags={"method": "GET"})
+        metrics.increment("http.requests", 2, tags={"method": "POST"})
+        metrics.observe("http.response_seconds", 0.5, {"method": "GET"})
+
+        # Validate
+        self.assertEqual(metrics.counter("http.requests"), 3)
+        self.assertEqual(metrics.counter("http.requests", method="POST"), 2)
+        self.assertEqual(metrics.values("http.response_seconds"), [0.5])
+
+    def test_session_metrics(self):
+        # Validate
+        self.assertIsNotNone(session_metrics(requests.Session()))
+
+
+class TestSessionMetrics(unittest.TestCase):
+    def test_requests_and_errors(self):
+        metrics = InMemoryMetrics()
+        session = HttpSession(metrics=metrics)
+        session.mount(
+            "http://", ScriptedAdapter([200, 503, requests.ConnectionError()])
+        )
+
+        # Test
+        session.get("http://test/get")
+        session.post("http://test/post")
+        with self.assertRaises(requests.ConnectionError):
+            session.get("http://test/get")
+
+        # Validate
+        self.assertEqual(metrics.counter("http.requests", status="200"), 1)
+        self.assertEqual(metrics.counter("http.requests", method="POST"), 1)
+        self.assertEqual(
+            metrics.counter("http.errors", error="ConnectionError"), 1
+        )
+        self.assertEqual(len(metrics.values("http.response_seconds")), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import mbn
+import unittest
+from midas_client.historical import HistoricalClient, _split_payload
+from midas_client.stream import merge_records
+from tests.test_policy import create_session
+from tests.test_stream import encode_metadata, encode_records, serve_records
+
+MINUTE = 60_000_000_000
+
+
+# Helper methods
+def create_payload(symbols: list, start: int, end: int, schema="Mbp1"):
+    return {
+        "symbols": symbols,
+        "start_ts": start,
+        "end_ts": end,
+        "schema": schema,
+        "dataset": "Equities",
+        "stype": "Raw",
+    }
+
+
+def decode(records: bytes) -> list:
+    return mbn.BufferStore(encode_metadata() + records).decode_to_array()
+
+
+class TestSplitPayload(unittest.TestCase):
+    def test_symbol_groups(self):
+        payload = create_payload(["A", "B", "C"], 0, 1000)
+
+        # Test
+        groups = _split_payload(payload, 2)
+
+        # Validate
+        self.assertEqual(
+            [[p["symbols"] for p in group] for group in groups],
+            [[["A", "C"]], [["B"]]],
+        )
+        self.assertEqual(groups[0][0]["start_ts"], 0)
+        self.assertEqual(groups[0][0]["end_ts"], 1000)
+
+    def test_symbol_and_time_shards(self):
+        payload = create_payload(["A", "B"], 0, 1000)
+
+        # Test
+        groups = _split_payload(payload, 4)
+
+        # Validate
+        self.assertEqual([len(group) for group in groups], [2, 2])
+        for group in groups:
+            self.assertEqual(
+                [(p["start_ts"], p["end_ts"]) for p in group],
+                [(0, 500), (500, 1000)],
+            )
+
+    def test_interval_aligned_bounds(self):
+        start, end = 7 * MINUTE + 123, 19 * MINUTE + 456
+        payload = create_payload(["A"], start, end, schema="Ohlcv1M")
+
+        # Test
+        (group,) = _split_payload(payload, 3)
+
+        # Validate
+        bounds = [p["start_ts"] for p in group] + [group[-1]["end_ts"]]
+        self.assertEqual(bounds[0], start)
+        self.assertEqual(bounds[-1], end)
+        for bound in bounds[1:-1]:
+            self.assertEqual(bound % MINUTE, 0)
+        for window in group:
+            self.assertLess(window["start_ts"], window["end_ts"])
+
+    def test_more_shards_than_window(self):
+        payload = create_payload(["A"], 0, 3)
+        bars = create_payload(["A"], 0, 2 * MINUTE, schema="Ohlcv1D")
+
+        # Test
+        (group,) = _split_payload(payload, 10)
+        (bar_group,) = _split_payload(bars, 4)
+
+        # Validate
+        self.assertEqual(
+            [(p["start_ts"], p["end_ts"]) for p in group],
+            [(0, 1), (1, 2), (2, 3)],
+        )
+        self.assertEqual(
+            [(p["start_ts"], p["end_ts"]) for p in bar_group],
+            [(0, 2 * MINUTE)],
+        )
+
+
+class TestGetRecordsParallel(unittest.TestCase):
+    def test_merged_in_time_order(self):
+        step = 100_000_000
+        symbols = {
+            "AAPL": (1, encode_records(10, id=1, step=step)),
+            "MSFT": (2, encode_records(10, id=2, step=step)),
+        }
+        session = create_session([serve_records(symbols)] * 4)
+        client = HistoricalClient("http://test", session)
+        params = mbn.RetrieveParams(
+            ["AAPL", "MSFT"],
+            "2024-01-02 15:25:03",
+            "2024-01-02 15:25:05",
+            mbn.Schema.MBP1,
+            mbn.Dataset.EQUITIES,
+            mbn.Stype.RAW,
+        )
+
+        # Test
+        store = client.get_records_parallel(params, shards=4)
+
+        # Validate
+        adapter = session.get_adapter("http://test")
+        self.assertEqual(len(adapter.requests), 4)
+
+        expected = merge_records([data for _, data in symbols.values()])
+        decoded = store.decode_to_array()
+        self.assertEqual(len(decoded), 20)
+        self.assertEqual(
+            [(r.ts_event, r.instrument_id) for r in decoded],
+            [(r.ts_event, r.instrument_id) for r in decode(expected)],
+        )
+        self.assertEqual(store.metadata.mappings.map, {1: "AAPL", 2: "MSFT"})
+
+
+if __name__ == "__main__":
+    unittest.main()
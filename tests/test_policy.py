@@ -0,0 +1,167 @@
+import io
+import unittest
+import requests
+from requests.adapters import BaseAdapter
+from midas_client.session import HttpSession
+from midas_client.policy import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RequestPolicy,
+)
+
+
+# Helper methods
+class ScriptedAdapter(BaseAdapter):
+    """
+    Answers requests with the given statuses or 200 response bodies, or
+    raises exceptions. A callable outcome is called with the request and
+    returns one of those.
+    """
+
+    def __init__(self, outcomes: list):
+        super().__init__()
+        self.outcomes = list(outcomes)
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(kwargs)
+        outcome = self.outcomes.pop(0)
+        if callable(outcome):
+            outcome = outcome(request)
+        if isinstance(outcome, Exception):
+            raise outcome
+
+        status, body = outcome, b""
+        if isinstance(outcome, bytes):
+            status, body = 200, outcome
+
+        response = requests.Response()
+        response.status_code = status
+        response.request = request
+        response.raw = io.BytesIO(body)
+        return response
+
+    def close(self):
+        pass
+
+
+def create_session(outcomes: list, **policy) -> HttpSession:
+    session = HttpSession(policy=RequestPolicy(backoff=0, **policy))
+    session.mount("http://", ScriptedAdapter(outcomes))
+    return session
+
+
+class TestRequestPolicy(unittest.TestCase):
+    def test_delay_bounded(self):
+        policy = RequestPolicy(backoff=1, max_backoff=5)
+
+        # Validate
+        for attempt in range(10):
+            delay = policy.delay(attempt)
+            self.assertTrue(0 <= delay <= min(5, 2**attempt))
+
+    def test_retry_idempotent(self):
+        session = create_session([503, requests.ConnectionError(), 200])
+
+        # Test
+        response = session.get("http://test/get")
+
+        # Validate
+        adapter = session.get_adapter("http://test")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(adapter.requests), 3)
+        self.assertEqual(adapter.requests[0]["timeout"], (10.0, 300.0))
+
+    def test_no_retry_post(self):
+        session = create_session([503, 200])
+
+        # Test
+        response = session.post("http://test/create")
+
+        # Validate
+        self.assertEqual(response.status_code, 503)
+
+    def test_retries_exhausted(self):
+        session = create_session([requests.Timeout()] * 3, retries=2)
+
+        # Validate
+        with self.assertRaises(requests.Timeout):
+            session.get("http://test/get")
+
+    def test_circuit_opens(self):
+        session = create_session(
+            [500, 500], retries=0, failure_threshold=2, reset_timeout=60
+        )
+        session.get("http://test/get")
+        session.get("http://test/get")
+
+        # Validate
+        with self.assertRaises(CircuitOpenError):
+            session.get("http://test/get")
+
+    def test_circuit_recovers_after_trial_error(self):
+        session = create_session(
+            [500, requests.exceptions.InvalidHeader(), 200],
+            retries=0,
+            failure_threshold=1,
+            reset_timeout=0,
+        )
+        session.get("http://test/get")
+
+        # Test
+        with self.assertRaises(requests.exceptions.InvalidHeader):
+            session.get("http://test/get")
+        response = session.get("http://test/get")
+
+        # Validate
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(session.breaker("http://test").is_open)
+
+    def test_circuit_per_host(self):
+        session = create_session(
+            [500, 500, 200], retries=0, failure_threshold=2, reset_timeout=60
+        )
+        session.get("http://failing/get")
+        session.get("http://failing/get")
+
+        # Test
+        response = session.get("http://healthy/get")
+
+        # Validate
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(session.breaker("http://failing/other").is_open)
+        self.assertFalse(session.breaker("http://healthy").is_open)
+        with self.assertRaises(CircuitOpenError):
+            session.get("http://failing/get")
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_half_open_trial(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+
+        # Test
+        breaker.before_request()
+
+        # Validate
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request()
+        breaker.record_success()
+        self.assertFalse(breaker.is_open)
+        breaker.before_request()
+
+    def test_failed_trial_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0)
+        for _ in range(3):
+            breaker.record_failure()
+        breaker.before_request()
+
+        # Test
+        breaker.record_failure()
+
+        # Validate
+        self.assertTrue(breaker.is_open)
+
+
+if __name__ == "__main__":
+    unittest.main()
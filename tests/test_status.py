@@ -0,0 +1,158 @@
+import json
+import unittest
+from typing import List
+from midas_client.metrics import InMemoryMetrics
+from midas_client.status import StatusParser, iter_status
+from midas_client.stream import TransferMeter
+
+
+# Helper methods
+class ChunkedResponse:
+    def __init__(self, chunks: List[bytes]):
+        self.chunks = chunks
+        self.closed = False
+
+    def iter_content(self, chunk_size=None):
+        return iter(self.chunks)
+
+    def close(self):
+        self.closed = True
+
+
+def split(data: bytes, size: int) -> List[bytes]:
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+MESSAGES = [
+    {"status": "success", "message": "Processing batch", "data": ""},
+    {"status": "success", "message": "Créé ✓", "data": "42"},
+]
+
+
+class TestStatusParser(unittest.TestCase):
+    def test_concatenated_messages(self):
+        data = "".join(json.dumps(m) for m in MESSAGES).encode()
+
+        # Test
+        parser = StatusParser()
+        messages = parser.feed(data)
+        parser.close()
+
+        # Validate
+        self.assertEqual(messages, MESSAGES)
+
+    def test_newline_delimited_messages(self):
+        data = "".join(json.dumps(m) + "\n" for m in MESSAGES).encode()
+
+        # Test
+        parser = StatusParser()
+        messages = parser.feed(data)
+        parser.close()
+
+        # Validate
+        self.assertEqual(messages, MESSAGES)
+
+    def test_messages_split_at_every_byte(self):
+        data = "\r\n".join(
+            json.dumps(m, ensure_ascii=False) for m in MESSAGES
+        ).encode()
+
+        # Test
+        parser = StatusParser()
+        messages = []
+        for chunk in split(data, 1):
+            messages.extend(parser.feed(chunk))
+        parser.close()
+
+        # Validate
+        self.assertEqual(messages, MESSAGES)
+
+    def test_incomplete_message(self):
+        data = json.dumps(MESSAGES[0]).encode()
+
+        # Test
+        parser = StatusParser()
+        messages = parser.feed(data[:-1])
+
+        # Validate
+        self.assertEqual(messages, [])
+        with self.assertRaises(ValueError):
+            parser.close()
+
+    def test_invalid_line_skipped(self):
+        data = b'{"a":1}\nnot json\n{"b":2}\n'
+
+        # Test
+        parser = StatusParser()
+        with self.assertWarns(UserWarning):
+            messages = parser.feed(data)
+        parser.close()
+
+        # Validate
+        self.assertEqual(messages, [{"a": 1}, {"b": 2}])
+        self.assertEqual(parser.skipped, ["not json"])
+
+    def test_invalid_line_split_at_every_byte(self):
+        data = b'{"a":1}\r\n{"a": oops}\r\n{"b":\n2}\n'
+
+        # Test
+        parser = StatusParser()
+        messages = []
+        with self.assertWarns(UserWarning):
+            for chunk in split(data, 1):
+                messages.extend(parser.feed(chunk))
+        parser.close()
+
+        # Validate
+        self.assertEqual(messages, [{"a": 1}, {"b": 2}])
+        self.assertEqual(parser.skipped, ['{"a": oops}'])
+
+
+class TestIterStatus(unittest.TestCase):
+    def test_iter_status(self):
+        data = "".join(json.dumps(m) for m in MESSAGES).encode()
+        response = ChunkedResponse(split(data, 7))
+        metrics = InMemoryMetrics()
+        progress = []
+
+        # Test
+        messages = list(
+            iter_status(
+                response,
+                TransferMeter(),
+                metrics,
+                "records.upload",
+                progress.append,
+            )
+        )
+
+        # Validate
+        self.assertEqual(messages, MESSAGES)
+        self.assertTrue(response.closed)
+        self.assertEqual([p.message for p in progress[:-1]], MESSAGES)
+        self.assertTrue(progress[-1].finished)
+        self.assertEqual(
+            metrics.counter("stream.messages", operation="records.upload"), 2
+        )
+        self.assertEqual(
+            metrics.counter("stream.incomplete", operation="records.upload"), 0
+        )
+
+    def test_iter_status_truncated(self):
+        data = json.dumps(MESSAGES[0]).encode()
+        response = ChunkedResponse([data[:10]])
+        metrics = InMemoryMetrics()
+
+        # Test
+        with self.assertRaises(ValueError):
+            list(iter_status(response, TransferMeter(), metrics, "upload"))
+
+        # Validate
+        self.assertTrue(response.closed)
+        self.assertEqual(
+            metrics.counter("stream.incomplete", operation="upload"), 1
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,362 @@
+import os
+import mbn
+import json
+import tempfile
+import unittest
+from typing import Callable, Dict, Optional, Tuple
+from midas_client.arrow import pa
+from midas_client.historical import HistoricalClient
+from midas_client.metrics import InMemoryMetrics
+from midas_client.stream import (
+    RecordCounter,
+    RecordFramer,
+    TransferMeter,
+    END_OF_STREAM,
+    encode_chunks,
+    merge_metadata,
+    merge_records,
+    metered_chunks,
+    slice_records,
+)
+from tests.test_policy import create_session
+
+
+# Helper methods
+def encode_metadata(
+    start: int = 1234567654321,
+    end: int = 987654345676543456,
+    mappings: Optional[dict] = None,
+) -> bytes:
+    metadata = mbn.Metadata(
+        mbn.Schema.MBP1,
+        mbn.Dataset.EQUITIES,
+        start,
+        end,
+        mbn.SymbolMap(mappings or {1: "AAPL"}),
+    )
+
+    encoder = mbn.PyMetadataEncoder()
+    encoder.encode_metadata(metadata)
+    return bytes(encoder.get_encoded_data())
+
+
+def encode_records(count: int, id: int = 1, step: int = 1) -> bytes:
+    encoder = mbn.PyRecordEncoder()
+    encoder.encode_records(create_msgs(count, id, step))
+    return bytes(encoder.get_encoded_data())
+
+
+def serve_records(symbols: Dict[str, Tuple[int, bytes]]) -> Callable:
+    """
+    Returns a `ScriptedAdapter` outcome answering a retrieve request with
+    the records of its symbols in its window, `symbols` mapping each symbol
+    to its instrument id and encoded records.
+    """
+
+    def respond(request) -> bytes:
+        payload = json.loads(request.body)
+        start, end = payload["start_ts"], payload["end_ts"]
+        mappings = {symbols[s][0]: s for s in payload["symbols"]}
+        records = merge_records(
+            [
+                slice_records(symbols[s][1], start, end)
+                for s in payload["symbols"]
+            ]
+        )
+        return encode_metadata(start, end, mappings) + records + END_OF_STREAM
+
+    return respond
+
+
+def create_msgs(count: int, id: int = 1, step: int = 1) -> list:
+    return [
+        mbn.Mbp1Msg(
+            instrument_id=id,
+            ts_event=1704209103644092564 + i * step,
+            rollover_flag=0,
+            price=6770,
+            size=1,
+            action=mbn.Action.TRADE,
+            side=mbn.Side.BID,
+            depth=0,
+            flags=0,
+            ts_recv=1704209103644092564 + i,
+            ts_in_delta=17493,
+            sequence=739763 + i,
+            discriminator=0,
+            levels=[mbn.BidAskPair(1, 2, 3, 4, 5, 6)],
+        )
+        for i in range(count)
+    ]
+
+
+class TestRecordFramer(unittest.TestCase):
+    def test_split_chunks(self):
+        metadata = encode_metadata()
+        records = encode_records(10)
+        stream = metadata + records + END_OF_STREAM
+        framer = RecordFramer()
+
+        # Test
+        taken = bytearray()
+        total = 0
+        for i in range(0, len(stream), 7):
+            framer.feed(stream[i : i + 7])
+            data, count = framer.take()
+            taken.extend(data)
+            total += count
+
+        # Validate
+        self.assertEqual(framer.metadata, metadata)
+        self.assertEqual(bytes(taken), records)
+        self.assertEqual(total, 10)
+        self.assertTrue(framer.finished)
+
+    def test_take_max_records(self):
+        metadata = encode_metadata()
+        records = encode_records(10)
+        framer = RecordFramer()
+        framer.feed(metadata + records)
+
+        # Test
+        data, count = framer.take(4)
+
+        # Validate
+        self.assertEqual(count, 4)
+        self.assertEqual(data, records[: len(records) * 4 // 10])
+        self.assertEqual(framer.buffered, len(records) * 6 // 10)
+
+    def test_end_of_stream_in_record_chunk(self):
+        metadata = encode_metadata()
+        records = encode_records(3)
+        framer = RecordFramer()
+
+        # Test
+        framer.feed(metadata + records + END_OF_STREAM + b"trailing")
+        data, count = framer.take()
+
+        # Validate
+        self.assertEqual(data, records)
+        self.assertEqual(count, 3)
+        self.assertTrue(framer.finished)
+        self.assertEqual(framer.buffered, 0)
+
+    def test_progress(self):
+        metadata = encode_metadata()
+        stream = metadata + encode_records(4) + END_OF_STREAM
+        framer = RecordFramer()
+
+        # Test
+        framer.feed(stream[:50])
+        framer.take()
+        partial = framer.progress
+        framer.feed(stream[50:])
+        framer.take()
+
+        # Validate
+        self.assertEqual(partial.bytes, 50)
+        self.assertFalse(partial.finished)
+        self.assertEqual(framer.progress.records, 4)
+        self.assertEqual(framer.progress.bytes, len(stream))
+        self.assertTrue(framer.progress.finished)
+        self.assertIsNotNone(framer.progress.first_byte)
+        self.assertGreaterEqual(framer.progress.elapsed, partial.elapsed)
+
+    def test_decode_taken_records(self):
+        metadata = encode_metadata()
+        framer = RecordFramer()
+        framer.feed(metadata + encode_records(5))
+
+        # Test
+        data, _ = framer.take()
+        records = mbn.BufferStore(framer.metadata + data).decode_to_array()
+
+        # Validate
+        self.assertEqual(len(records), 5)
+
+
+class TestRecordCounter(unittest.TestCase):
+    def test_split_chunks(self):
+        stream = encode_metadata() + encode_records(10)
+
+        for size in (1, 7, 100, len(stream)):
+            counter = RecordCounter()
+
+            # Test
+            for i in range(0, len(stream), size):
+                counter.feed(stream[i : i + size])
+
+            # Validate
+            self.assertEqual(counter.records, 10)
+            self.assertEqual(counter.bytes, len(stream))
+
+    def test_partial_record(self):
+        metadata = encode_metadata()
+        records = encode_records(2)
+        counter = RecordCounter()
+
+        # Test
+        counter.feed(metadata + records[: len(records) * 3 // 4])
+        partial = counter.records
+        counter.feed(records[len(records) * 3 // 4 :])
+
+        # Validate
+        self.assertEqual(partial, 1)
+        self.assertEqual(counter.records, 2)
+
+
+class TestMerge(unittest.TestCase):
+    def test_merge_records(self):
+        first = encode_records(5, id=1, step=2)
+        second = encode_records(5, id=2, step=3)
+
+        # Test
+        merged = merge_records([first, second])
+        store = mbn.BufferStore(encode_metadata() + merged)
+        records = store.decode_to_array()
+
+        # Validate
+        ts_event = [r.ts_event for r in records]
+        self.assertEqual(len(records), 10)
+        self.assertEqual(ts_event, sorted(ts_event))
+        self.assertEqual(records[0].instrument_id, 1)
+        self.assertEqual(records[1].instrument_id, 2)
+
+    def test_merge_metadata(self):
+        first = encode_metadata(10, 20, {1: "AAPL"})
+        second = encode_metadata(15, 30, {2: "TSLA"})
+
+        # Test
+        merged = mbn.Metadata.decode(merge_metadata([first, second]))
+
+        # Validate
+        self.assertEqual(merged.start, 10)
+        self.assertEqual(merged.end, 30)
+        self.assertEqual(merged.mappings.map, {1: "AAPL", 2: "TSLA"})
+
+
+class TestEncodeChunks(unittest.TestCase):
+    def test_fixed_size_chunks(self):
+        metadata = encode_metadata()
+        records = encode_records(10)
+
+        # Test
+        chunks = list(encode_chunks([metadata, records], chunk_size=100))
+
+        # Validate
+        self.assertTrue(all(len(c) == 100 for c in chunks[:-1]))
+        self.assertEqual(b"".join(chunks), metadata + records)
+
+    def test_encode_record_objects(self):
+        metadata = mbn.Metadata.decode(encode_metadata())
+
+        # Test
+        chunks = encode_chunks(create_msgs(10), metadata=metadata)
+        store = mbn.BufferStore(b"".join(chunks))
+
+        # Validate
+        self.assertEqual(len(store.decode_to_array()), 10)
+
+
+class TestTransferMeter(unittest.TestCase):
+    def test_metered_chunks(self):
+        metadata = encode_metadata()
+        records = encode_records(10)
+        meter = TransferMeter()
+        progress = []
+
+        # Test
+        chunks = metered_chunks(
+            encode_chunks([metadata, records], chunk_size=100),
+            meter,
+            progress.append,
+        )
+        sent = b"".join(chunks)
+
+        # Validate
+        self.assertEqual(sent, metadata + records)
+        self.assertEqual(meter.bytes, len(sent))
+        self.assertEqual(meter.records, 10)
+        self.assertEqual(len(progress), -(-len(sent) // 100))
+        self.assertIsNone(meter.first_byte)
+
+    def test_report(self):
+        meter = TransferMeter()
+        meter.responded()
+        meter.bytes = 100
+        meter.records = 2
+        metrics = InMemoryMetrics()
+
+        # Test
+        meter.report(metrics, "records.download", finished=False)
+
+        # Validate
+        tags = {"operation": "records.download"}
+        self.assertEqual(metrics.counter("stream.bytes", **tags), 100)
+        self.assertEqual(metrics.counter("stream.records", **tags), 2)
+        self.assertEqual(metrics.counter("stream.incomplete", **tags), 1)
+        self.assertEqual(len(metrics.values("stream.first_byte_seconds")), 1)
+
+
+class TestIncompleteStream(unittest.TestCase):
+    def setUp(self):
+        # Response cut off before the server's end-of-stream message
+        body = encode_metadata() + encode_records(5)
+        self.client = HistoricalClient("http://test", create_session([body]))
+        self.params = mbn.RetrieveParams(
+            ["AAPL"],
+            "2024-01-02 00:00:00",
+            "2024-01-03 00:00:00",
+            mbn.Schema.MBP1,
+            mbn.Dataset.EQUITIES,
+            mbn.Stype.RAW,
+        )
+
+    def test_get_records(self):
+        # Validate
+        with self.assertRaises(ValueError):
+            self.client.get_records(self.params)
+
+    def test_get_records_to_file(self):
+        with tempfile.TemporaryDirectory() as dir:
+            path = os.path.join(dir, "records.bin")
+
+            # Test
+            with self.assertRaises(ValueError):
+                self.client.get_records_to_file(self.params, path)
+
+            # Validate
+            self.assertEqual(os.listdir(dir), [])
+
+    def test_stream_records(self):
+        batches = []
+
+        # Test
+        with self.assertRaises(ValueError):
+            for batch in self.client.stream_records(self.params, 2):
+                batches.append(batch)
+
+        # Validate
+        self.assertEqual([len(b) for b in batches], [2, 2])
+
+    def test_stream_records_without_metadata(self):
+        client = HistoricalClient("http://test", create_session([b""]))
+
+        # Validate
+        with self.assertRaises(ValueError):
+            list(client.stream_records(self.params))
+
+    @unittest.skipIf(pa is None, "pyarrow is not installed")
+    def test_get_records_to_parquet(self):
+        with tempfile.TemporaryDirectory() as root:
+            # Test
+            with self.assertRaises(ValueError):
+                self.client.get_records_to_parquet(self.params, root, 2)
+
+            # Validate
+            files = [f for _, _, names in os.walk(root) for f in names]
+            self.assertEqual(files, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
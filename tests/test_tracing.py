@@ -0,0 +1,185 @@
+import mbn
+import unittest
+from midas_client.historical import HistoricalClient
+from midas_client.ingest import upload_ordered
+from midas_client.session import HttpSession
+from midas_client.tracing import (
+    OpenTelemetryExporter,
+    RingBufferExporter,
+    Tracer,
+    otel_trace,
+    phase,
+    traced,
+)
+from tests.test_policy import ScriptedAdapter
+from tests.test_stream import encode_records, serve_records
+
+
+# Helper methods
+class FakeClient:
+    def __init__(self, session: HttpSession):
+        self.session = session
+
+    @traced
+    def get(self) -> int:
+        with phase("decode"):
+            return self.session.get("http://test/get").status_code
+
+    @traced
+    def stream(self):
+        for _ in range(3):
+            yield self.session.get("http://test/stream", stream=True)
+
+    @traced
+    def upload(self, batches: list):
+        def post(batch: bytes) -> None:
+            self.session.post("http://test/upload", data=batch)
+
+        return upload_ordered(batches, post, connections=2)
+
+
+def create_session(outcomes: list) -> HttpSession:
+    session = HttpSession(tracer=Tracer())
+    session.mount("http://", ScriptedAdapter(outcomes))
+    return session
+
+
+class TestTracer(unittest.TestCase):
+    def test_ring_buffer(self):
+        tracer = Tracer(RingBufferExporter(capacity=2))
+
+        # Test
+        for name in ("a", "b", "c"):
+            with tracer.span(name):
+                with phase("decode"):
+                    pass
+
+        # Validate
+        spans = tracer.exporter.spans
+        self.assertEqual([s.name for s in spans], ["b", "c"])
+        self.assertIn("decode", spans[0].phases)
+
+    def test_error(self):
+        tracer = Tracer()
+
+        # Test
+        with self.assertRaises(ValueError):
+            with tracer.span("failing"):
+                raise ValueError("Error with request")
+
+        # Validate
+        self.assertIn("Error with request", tracer.exporter.spans[0].error)
+
+    def test_nested(self):
+        tracer = Tracer()
+
+        # Test
+        with tracer.span("outer") as outer:
+            with tracer.span("inner"):
+                pass
+
+        # Validate
+        inner = tracer.exporter.spans[0]
+        self.assertEqual(inner.parent_id, outer.span_id)
+
+    @unittest.skipIf(otel_trace is None, "opentelemetry is not installed")
+    def test_opentelemetry(self):
+        tracer = Tracer(OpenTelemetryExporter())
+
+        # Validate
+        with tracer.span("exported"):
+            pass
+
+
+class TestTracedClient(unittest.TestCase):
+    def test_method(self):
+        client = FakeClient(create_session([200]))
+
+        # Test
+        status = client.get()
+
+        # Validate
+        (span,) = client.session.tracer.exporter.spans
+        self.assertEqual(status, 200)
+        self.assertEqual(span.name, "FakeClient.get")
+        self.assertEqual(span.attributes["http.path"], "/get")
+        self.assertEqual(span.attributes["http.status_code"], 200)
+        self.assertIn("ttfb", span.phases)
+        self.assertIn("decode", span.phases)
+
+    def test_generator(self):
+        client = FakeClient(create_session([200, 200, 200]))
+
+        # Test
+        responses = list(client.stream())
+
+        # Validate
+        (span,) = client.session.tracer.exporter.spans
+        self.assertEqual(len(responses), 3)
+        self.assertEqual(span.name, "FakeClient.stream")
+        self.assertEqual(span.attributes["http.requests"], 3)
+
+    def test_untraced_request(self):
+        session = create_session([404])
+
+        # Test
+        session.get("http://test/missing")
+
+        # Validate
+        (span,) = session.tracer.exporter.spans
+        self.assertEqual(span.name, "GET /missing")
+        self.assertEqual(span.attributes["http.status_code"], 404)
+
+    def test_no_tracer(self):
+        session = HttpSession()
+        session.mount("http://", ScriptedAdapter([200]))
+
+        # Validate
+        self.assertEqual(FakeClient(session).get(), 200)
+
+
+class TestPoolThreads(unittest.TestCase):
+    def test_parallel_shards(self):
+        symbols = {
+            "AAPL": (1, encode_records(10, id=1, step=100_000_000)),
+            "MSFT": (2, encode_records(10, id=2, step=100_000_000)),
+        }
+        session = create_session([serve_records(symbols)] * 4)
+        client = HistoricalClient("http://test", session)
+        params = mbn.RetrieveParams(
+            ["AAPL", "MSFT"],
+            "2024-01-02 15:25:03",
+            "2024-01-02 15:25:05",
+            mbn.Schema.MBP1,
+            mbn.Dataset.EQUITIES,
+            mbn.Stype.RAW,
+        )
+
+        # Test
+        store = client.get_records_parallel(params, shards=4)
+
+        # Validate
+        (span,) = session.tracer.exporter.spans
+        self.assertEqual(span.name, "HistoricalClient.get_records_parallel")
+        self.assertEqual(span.attributes["http.requests"], 4)
+        self.assertEqual(span.attributes["records"], 20)
+        self.assertGreater(span.attributes["payload_bytes"], 0)
+        self.assertIn("transfer", span.phases)
+        self.assertEqual(len(store.decode_to_array()), 20)
+
+    def test_upload_ordered(self):
+        client = FakeClient(create_session([200] * 4))
+
+        # Test
+        acks = client.upload([b"a", b"bb", b"ccc", b"dddd"])
+
+        # Validate
+        (span,) = client.session.tracer.exporter.spans
+        self.assertEqual(len(acks), 4)
+        self.assertEqual(span.name, "FakeClient.upload")
+        self.assertEqual(span.attributes["http.requests"], 4)
+        self.assertEqual(span.attributes["request_bytes"], 10)
+
+
+if __name__ == "__main__":
+    unittest.main()